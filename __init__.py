@@ -2,4 +2,11 @@
 # -*- coding: utf-8 -*-
 
 from jira_connector import JiraConnector
-__all__ = ["JiraConnector"]
+from jira_federation import FederatedJiraConnector
+from jira_analytics import ChangelogAnalytics, TimeInStatus, TDigest, SketchSet, \
+    ReleaseMetrics
+from jira_sharding import ShardedExtraction, WorkQueue
+from jira_webhook import JiraWebhookReceiver
+__all__ = ["JiraConnector", "FederatedJiraConnector", "ChangelogAnalytics",
+           "TimeInStatus", "TDigest", "SketchSet", "ReleaseMetrics",
+           "ShardedExtraction", "WorkQueue", "JiraWebhookReceiver"]
@@ -16,7 +16,9 @@ may be different on different converters.
     $ python doc2md.py module [...]
 
 doc2md.py scans every python file (.py) given and generates the documentation
-in a subfolder `doc`.
+in a subfolder `doc`. Files are parsed, not imported, so their dependencies
+are not needed. Hashes of processed files are kept in `doc/.doc2md.json` and
+unchanged files are skipped, changed ones are processed in parallel.
 
 ## Example output
 
@@ -30,8 +32,10 @@ in a subfolder `doc`.
 
 import sys
 import os
-import imp
-import inspect
+import ast
+import json
+import hashlib
+from multiprocessing import Pool
 
 
 __author__ = "Benjamin Sientzoff"
@@ -39,6 +43,8 @@ __version__ = "0.1.2b"
 __maintainer__ = "Benjamin Sientzoff (blasterbug)"
 __license__ = "GNU GPL V2"
 
+MANIFEST = '.doc2md.json'
+
 def remove_extension( fl ):
     """
     Remove extention from the program file name
@@ -55,28 +61,35 @@ def fmt_doc(doc, indent=''):
         s += '%s%s  \n' % (indent, line.strip())
     return s.rstrip()
 
-def insp_file(file_name):
+def fmt_value(node):
     """
-    Inspect a file and return module information
+    Format a value node like its string representation.
     """
-    mod_inst = imp.load_source(remove_extension( file_name ), file_name)
+    try:
+        return '%s' % (ast.literal_eval(node),)
+    except ValueError:
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return '%s.%s' % (fmt_value(node.value), node.attr)
+        return '...'
 
-    if not mod_inst:
-        sys.stderr.write("Failed to import '%s'\n" % (file_name))
-        sys.exit(2)
+def insp_file(file_name):
+    """
+    Parse a file and return module information without importing it
+    """
+    with open(file_name, 'r') as source_file:
+        tree = ast.parse(source_file.read(), file_name)
 
-    mod_name = inspect.getmodulename(file_name)
-    if not mod_name:
-        mod_name = os.path.splitext(os.path.basename(file_name))[0]
-    return insp_mod(mod_name, mod_inst)
+    mod_name = os.path.splitext(os.path.basename(file_name))[0]
+    return insp_mod(mod_name, tree)
 
-def insp_mod(mod_name, mod_inst):
+def insp_mod(mod_name, tree):
     """
-    Inspect a module return doc, vars, functions and classes.
+    Inspect a module tree return doc, vars, functions and classes.
     """
     info = {
         'name': mod_name,
-        'inst': mod_inst,
         'author': {},
         'doc': '',
         'vars': [],
@@ -85,92 +98,111 @@ def insp_mod(mod_name, mod_inst):
     }
 
     # Get module documentation
-    mod_doc = inspect.getdoc(mod_inst)
+    mod_doc = ast.get_docstring(tree)
     if mod_doc:
         info['doc'] = mod_doc
 
-    for attr_name in ['author', 'copyright', 'license', 'version', 'maintainer', 'email']:
-        if hasattr(mod_inst, '__%s__' % (attr_name)):
-            info['author'][attr_name] = getattr(mod_inst, '__%s__' % (attr_name))
-
-    # Get module global vars
-    for member_name, member_inst in inspect.getmembers(mod_inst):
-        if not member_name.startswith('_') and \
-           not inspect.isfunction(member_inst) and \
-           not inspect.isclass(member_inst) and \
-           not inspect.ismodule(member_inst) and \
-           member_inst.__module__ == mod_name and \
-           member_name not in mod_inst.__builtins__:
-            info['vars'].append( (member_name, member_inst) )
-
-    # Get module functions
-    functions = inspect.getmembers(mod_inst, inspect.isfunction)
-    if functions:
-        for func_name, func_inst in functions:
-            if func_inst.__module__ == mod_name :
-                info['functions'].append(insp_method(func_name, func_inst))
-
-    # Get module classes
-    classes = inspect.getmembers(mod_inst, inspect.isclass)
-    if classes:
-        for class_name, class_inst in classes:
-            if class_inst.__module__ == mod_name :
-                info['classes'].append(insp_class(class_name, class_inst))
-
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                try:
+                    value = ast.literal_eval(node.value)
+                except ValueError:
+                    continue
+                # Get module author attributes and global vars
+                if target.id.startswith('__') and target.id.endswith('__'):
+                    attr_name = target.id[2:-2]
+                    if attr_name in ['author', 'copyright', 'license', 'version',
+                                     'maintainer', 'email']:
+                        info['author'][attr_name] = value
+                elif not target.id.startswith('_'):
+                    info['vars'].append( (target.id, value) )
+        elif isinstance(node, ast.FunctionDef):
+            info['functions'].append(insp_method(node))
+        elif isinstance(node, ast.ClassDef):
+            info['classes'].append(insp_class(node))
+
+    for key in ('vars', 'functions', 'classes'):
+        info[key].sort(key=lambda item: item[0] if key == 'vars' else item['name'])
     return info
 
-def insp_class(class_name, class_inst):
+def insp_class(class_node):
     """
     Inspect class and return doc, methods.
     """
     info = {
-        'name': class_name,
-        'inst': class_inst,
+        'name': class_node.name,
         'doc': '',
         'methods': [],
     }
 
     # Get class documentation
-    class_doc = inspect.getdoc(class_inst)
+    class_doc = ast.get_docstring(class_node)
     if class_doc:
         info['doc'] = fmt_doc(class_doc)
 
     # Get class methods
-    methods = inspect.getmembers(class_inst, inspect.ismethod)
-    for method_name, method_inst in methods:
-        info['methods'].append(insp_method(method_name, method_inst))
+    for node in class_node.body:
+        if isinstance(node, ast.FunctionDef):
+            decorators = [fmt_value(decorator) for decorator in node.decorator_list]
+            if 'staticmethod' not in decorators:
+                info['methods'].append(insp_method(node))
+    info['methods'].sort(key=lambda method: method['name'])
 
     return info
 
-def insp_method(method_name, method_inst):
+def insp_method(method_node):
     """
     Inspect a method and return arguments, doc.
     """
     info = {
-        'name': method_name,
-        'inst': method_inst,
+        'name': method_node.name,
         'args': [],
         'doc': ''
     }
 
     # Get method arguments
-    method_args = inspect.getargspec(method_inst)
-    for arg in method_args.args:
-        if arg != 'self':
-            info['args'].append(arg)
+    args = [getattr(arg, 'arg', None) or getattr(arg, 'id', None) or '...'
+            for arg in method_node.args.args]
+    defaults = method_node.args.defaults
+    if args and args[0] in ('self', 'cls'):
+        args = args[1:]
+    info['args'] = args
 
     # Apply default argumument values to arguments
-    if method_args.defaults:
-        a_pos = len(info['args']) - len(method_args.defaults)
-        for pos, default in enumerate(method_args.defaults):
-            info['args'][a_pos + pos] = '%s=%s' % (info['args'][a_pos + pos], default)
+    if defaults:
+        a_pos = len(info['args']) - len(defaults)
+        for pos, default in enumerate(defaults):
+            info['args'][a_pos + pos] = '%s=%s' % (info['args'][a_pos + pos], fmt_value(default))
 
     # Print method documentation
-    method_doc = inspect.getdoc(method_inst)
+    method_doc = ast.get_docstring(method_node)
     if method_doc:
         info['doc'] = fmt_doc(method_doc)
     return info
 
+def file_hash(file_name):
+    """
+    Return hash of the file and of the generator itself.
+    """
+    digest = hashlib.sha1()
+    for name in (__file__.replace('.pyc', '.py'), file_name):
+        with open(name, 'rb') as hashed_file:
+            digest.update(hashed_file.read())
+    return digest.hexdigest()
+
+def generate(file_name):
+    """
+    Return Markdown documentation of the file or the parse error.
+    Errors are returned, not raised, as exiting a pool worker hangs the pool.
+    """
+    try:
+        return file_name, to_markdown(insp_file(file_name)), None
+    except (IOError, SyntaxError) as e:
+        return file_name, None, "Failed to parse '%s': %s" % (file_name, e)
+
 
 def to_markdown( text_block ) :
     """
@@ -178,13 +210,13 @@ def to_markdown( text_block ) :
     :param text_block: inspect file to turn to Markdown
     :return: Markdown doc into a string
     """
-    doc_output = ("# %s  \n" % file_i['name'] )
-    doc_output += file_i['doc'] + '  \n'
+    doc_output = ("# %s  \n" % text_block['name'] )
+    doc_output += text_block['doc'] + '  \n'
     author = ''
-    if 'author' in file_i['author']:
-        author += file_i['author']['author'] + ' '
-    if 'email' in file_i['author']:
-        author += '<%s>' % (file_i['author']['email'])
+    if 'author' in text_block['author']:
+        author += text_block['author']['author'] + ' '
+    if 'email' in text_block['author']:
+        author += '<%s>' % (text_block['author']['email'])
     if author:
         doc_output += str("\n __Author__: %s  \n" % author )
 
@@ -194,17 +226,17 @@ def to_markdown( text_block ) :
         ('License', 'license'),
     ]
     for attr_friendly, attr_name in author_attrs:
-        if attr_name in file_i['author']:
-            doc_output += " __%s__: %s  \n" % (attr_friendly, file_i['author'][attr_name])
+        if attr_name in text_block['author']:
+            doc_output += " __%s__: %s  \n" % (attr_friendly, text_block['author'][attr_name])
 
-    if file_i['vars']:
+    if text_block['vars']:
         doc_output += "\n## Variables\n"
-        for var_name, var_inst in file_i['vars']:
+        for var_name, var_inst in text_block['vars']:
             doc_output += " - `%s`: %s\n" % (var_name, var_inst)
 
-    if file_i['functions']:
+    if text_block['functions']:
         doc_output += "\n\n## Functions\n"
-        for function_i in file_i['functions']:
+        for function_i in text_block['functions']:
             if function_i['name'].startswith('_'):
                 continue
             doc_output += "\n\n### `%s(%s)`\n" % (function_i['name'], ', '.join(function_i['args']))
@@ -213,9 +245,9 @@ def to_markdown( text_block ) :
             else:
                 doc_output += "No documentation for this function  "
 
-    if  file_i['classes']:
+    if  text_block['classes']:
         doc_output += "\n\n## Classes\n"
-        for class_i in file_i['classes']:
+        for class_i in text_block['classes']:
             doc_output += "\n\n### class `%s()`\n" % (class_i['name'])
             if class_i['doc']:
                 doc_output += "%s  " % (class_i['doc'])
@@ -234,15 +266,46 @@ def to_markdown( text_block ) :
 if __name__ == '__main__':
     if 1 < len(sys.argv) :
         doc_dir = "doc"
+        if not os.path.exists( doc_dir ) :
+            os.makedirs( doc_dir )
+        manifest = {}
+        manifest_name = os.path.join( doc_dir, MANIFEST )
+        if os.path.exists( manifest_name ) :
+            with open( manifest_name, 'r' ) as manifest_file:
+                manifest = json.load( manifest_file )
+
+        # Skip files not changed since the last run
+        hashes = dict( (arg, file_hash(arg)) for arg in sys.argv[1:] )
+        changed = [arg for arg in sys.argv[1:]
+                   if manifest.get(arg) != hashes[arg] or
+                   not os.path.exists( doc_dir + "/" + remove_extension(arg) + ".md" )]
         for arg in sys.argv[1:] :
-            file_i = insp_file(arg)
-            doc_content = to_markdown(file_i)
-            if not os.path.exists( doc_dir ) :
-                os.makedirs( doc_dir )
+            if arg not in changed :
+                sys.stdout.write( "Documentation for %s is up to date\n" % arg )
+
+        if len(changed) > 1 :
+            pool = Pool()
+            results = pool.map(generate, changed)
+            pool.close()
+            pool.join()
+        else:
+            results = [generate(arg) for arg in changed]
+        failed = False
+        for arg, doc_content, error in results :
+            if error is not None :
+                sys.stderr.write( error + "\n" )
+                failed = True
+                continue
             doc_file = open( doc_dir + "/" + remove_extension(arg) + ".md", 'w')
             sys.stdout.write( "Writing documentation for %s in doc/\n" % arg )
             doc_file.write( doc_content )
             doc_file.close()
+            manifest[arg] = hashes[arg]
+
+        with open( manifest_name, 'w' ) as manifest_file:
+            json.dump( manifest, manifest_file, indent=2, sort_keys=True )
+        if failed :
+            sys.exit(2)
     else:
         sys.stderr.write('Usage: %s <file.py>\n' % (sys.argv[0]))
         sys.exit(1)
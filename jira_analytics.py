@@ -0,0 +1,777 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Analytics over Jira issue changelogs.
+
+Changelog computations like reopen counts, resolution dates and last resolvers
+are CPU-bound, so they are sharded across worker processes. Issues are reduced
+to a compact form holding only status transitions and passed between processes
+as JSON strings instead of pickled Jira Resource objects.
+
+TimeInStatus collects durations of issues in every status in one pass over
+an issue stream, keeping only per-issue and per-group sums in memory.
+
+TDigest and SketchSet estimate percentiles of durations over unbounded issue
+streams in constant memory. Sketches are serialized to JSON and merged across
+runs or shards.
+
+ReleaseMetrics keeps per-issue contributions to per-version release metrics on
+disk and recomputes only the aggregates affected by changed issues.
+
+## Usage
+
+```python
+from jira_connector import JiraConnector
+from jira_analytics import ChangelogAnalytics, SketchSet, ReleaseMetrics
+
+jira_connect = JiraConnector(config='config/config.yml')
+raw = jira_connect.jira.search_issues('project="FE" and issuetype=Bug', maxResults=1000,
+                                      expand='changelog', json_result=True)
+analytics = ChangelogAnalytics(processes=4)
+metrics = analytics.run(raw['issues'])
+print metrics['FE-1']['reopen_count'], metrics['FE-1']['last_resolver']
+
+time_in_status = jira_connect.get_time_in_status('project="FE"', group_by=['fixVersions'])
+print time_in_status.aggregate('fixVersions')['1.4.2']['In Progress']['average']
+
+sketches = jira_connect.get_lead_time_sketches('project="FE" and resolution=Done')
+sketches.dump('lead_time.json')
+print SketchSet.load('lead_time.json').quantiles((0.5, 0.9, 0.99))
+
+release_metrics = ReleaseMetrics('metrics/FE.json')
+release_metrics.refresh(jira_connect, 'FE')
+print release_metrics.get_version_metrics('1.4.2')
+```
+
+"""
+
+import os
+import sys
+import json
+import math
+import datetime
+import itertools
+from multiprocessing import Pool, cpu_count
+import dateutil.parser
+import dateutil.tz
+
+__author__ = "Alexander Grechin"
+__version__ = "0.4"
+__maintainer__ = "Alexander Grechin"
+__license__ = "GNU GPL V2"
+
+
+def compact_issue(issue, fields=('status',)):
+    """Function returns compact form of an issue with changelog
+
+    Args:
+      issue (obj): Jira issue expanded by changelog, its raw dict or compact form
+      fields (tuple): changelog fields to keep, status by default
+
+    Returns:
+      dict: key, created date and list of histories
+        [created, author, [[field, fromString, toString], ...]]
+    """
+
+    if isinstance(issue, dict) and 'histories' in issue:
+        return issue
+    raw = getattr(issue, 'raw', issue)
+    histories = []
+    for history in raw.get('changelog', {}).get('histories', []):
+        items = [[item.get('field'), item.get('fromString'), item.get('toString')]
+                 for item in history.get('items', [])
+                 if fields is None or item.get('field') in fields]
+        if items:
+            author = history.get('author') or {}
+            histories.append([history.get('created'), author.get('name'), items])
+    return {'key': raw.get('key'),
+            'created': raw.get('fields', {}).get('created'),
+            'histories': histories}
+
+
+def issue_metrics(compact, resolved_status='Developed', reopen_status='Reopened'):
+    """Function returns changelog metrics of the compact issue
+
+    Args:
+      compact (dict): compact issue
+      resolved_status (str): status treated as resolution
+      reopen_status (str): status treated as reopening
+
+    Returns:
+      dict: reopen_count, resolution_date, last_resolver and
+        resolution_time in seconds from creation to the last resolution
+    """
+
+    reopen_count = 0
+    resolution_date = None
+    last_resolver = ''
+    for created, author, items in compact['histories']:
+        for field, _, to_string in items:
+            if field != 'status':
+                continue
+            if to_string == reopen_status:
+                reopen_count += 1
+            elif to_string == resolved_status:
+                resolution_date = created
+                last_resolver = author
+    resolution_time = None
+    if resolution_date and compact.get('created'):
+        resolution_time = (dateutil.parser.parse(resolution_date) -
+                           dateutil.parser.parse(compact['created'])).total_seconds()
+    return {'reopen_count': reopen_count,
+            'resolution_date': resolution_date,
+            'last_resolver': last_resolver,
+            'resolution_time': resolution_time}
+
+
+def _chunk_metrics(chunk):
+    """Internal worker function computing metrics of the JSON encoded chunk"""
+
+    chunk = json.loads(chunk)
+    return json.dumps(dict(
+        (compact['key'], issue_metrics(compact, chunk['resolved_status'],
+                                       chunk['reopen_status']))
+        for compact in chunk['issues']))
+
+
+class ChangelogAnalytics(object):
+    """ChangelogAnalytics class
+        Attributes:
+            processes (int, optional): Number of worker processes, CPU count by default
+            chunk_size (int, optional): Number of issues sent to a worker at once, 500 by default
+            window (int, optional): Number of chunks in flight per process, 2 by default
+            resolved_status (str, optional): status treated as resolution, Developed by default
+            reopen_status (str, optional): status treated as reopening, Reopened by default
+    """
+
+    def __init__(self, processes=None, chunk_size=500,
+                 resolved_status='Developed', reopen_status='Reopened', window=2):
+        """Initialization"""
+        self.processes = processes
+        self.chunk_size = int(chunk_size)
+        self.window = int(window)
+        self.resolved_status = resolved_status
+        self.reopen_status = reopen_status
+
+    def _chunks(self, issues):
+        """Internal generator of JSON encoded chunks of compact issues"""
+
+        issues = iter(issues)
+        while True:
+            chunk = [compact_issue(issue)
+                     for issue in itertools.islice(issues, self.chunk_size)]
+            if not chunk:
+                break
+            yield json.dumps({'resolved_status': self.resolved_status,
+                              'reopen_status': self.reopen_status,
+                              'issues': chunk})
+
+    def run(self, issues):
+        """Function returns changelog metrics for every issue
+
+        Args:
+          issues (iterable): Jira issues expanded by changelog or raw dicts,
+            it is consumed lazily, at most window chunks per process are
+            held in memory at once
+
+        Returns:
+          dict: issue key -> dict of metrics, see issue_metrics
+        """
+
+        results = {}
+        chunks = self._chunks(issues)
+        # Pool reads the whole task iterator ahead of workers, so it is fed
+        # by bounded batches
+        batch_size = (self.processes or cpu_count()) * self.window
+        pool = Pool(self.processes)
+        try:
+            while True:
+                batch = list(itertools.islice(chunks, batch_size))
+                if not batch:
+                    break
+                for chunk in pool.imap_unordered(_chunk_metrics, batch):
+                    results.update(json.loads(chunk))
+        finally:
+            pool.close()
+            pool.join()
+        return results
+
+    def aggregate(self, results):
+        """Function returns aggregated metrics over all issues
+
+        Args:
+          results (dict): result of run method
+
+        Returns:
+          dict: issues, reopen_count, resolved and average resolution_time in seconds
+        """
+
+        resolution_times = [metrics['resolution_time'] for metrics in results.values()
+                            if metrics['resolution_time'] is not None]
+        average = None
+        if resolution_times:
+            average = sum(resolution_times) / len(resolution_times)
+        return {'issues': len(results),
+                'reopen_count': sum(metrics['reopen_count'] for metrics in results.values()),
+                'resolved': len(resolution_times),
+                'resolution_time': average}
+
+
+def field_values(raw, field):
+    """Function returns list of grouping values of the issue field
+
+    Args:
+      raw (dict): raw Jira issue
+      field (str): field name like fixVersions, assignee or issuetype
+
+    Returns:
+      list: list of names, several ones for list fields like versions
+    """
+
+    value = raw.get('fields', {}).get(field)
+    if not isinstance(value, list):
+        value = [value]
+    names = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get('name') or item.get('key') or item.get('value')
+        names.append(item)
+    return names or [None]
+
+
+class TimeInStatus(object):
+    """TimeInStatus class, streaming per-issue and per-status duration matrix
+        Attributes:
+            group_by (list, optional): fields to aggregate durations by
+            keep_issues (bool, optional): keep per-issue matrix, True by default
+            now (datetime, optional): end of the current status, current time by default
+            issues (dict): issue key -> status -> seconds
+            groups (dict): field -> value -> status -> [total seconds, number of issues]
+    """
+
+    def __init__(self, group_by=None, keep_issues=True, now=None):
+        """Initialization"""
+        self.group_by = list(group_by or [])
+        self.keep_issues = keep_issues
+        self.now = now or datetime.datetime.now(dateutil.tz.tzutc())
+        self.issues = {}
+        self.groups = dict((field, {}) for field in self.group_by)
+        self.count = 0
+
+    def durations(self, issue, changelog=None):
+        """Function returns time spent by the issue in every status
+
+        Args:
+          issue (obj): Jira issue expanded by changelog or its raw dict
+          changelog (dict, optional): compact changelog, the issue changelog by default
+
+        Returns:
+          dict: status -> seconds
+        """
+
+        raw = getattr(issue, 'raw', issue)
+        compact = compact_issue(changelog if changelog is not None else raw)
+        transitions = []
+        for created, _, items in compact['histories']:
+            for field, from_string, to_string in items:
+                if field == 'status':
+                    transitions.append((dateutil.parser.parse(created),
+                                        from_string, to_string))
+        transitions.sort(key=lambda transition: transition[0])
+        if transitions:
+            status = transitions[0][1]
+        else:
+            status = (raw['fields'].get('status') or {}).get('name')
+        since = dateutil.parser.parse(raw['fields']['created'])
+        result = {}
+        for date, _, to_string in transitions:
+            result[status] = result.get(status, 0) + (date - since).total_seconds()
+            status, since = to_string, date
+        result[status] = result.get(status, 0) + max((self.now - since).total_seconds(), 0)
+        return result
+
+    def add(self, issue, changelog=None):
+        """Function adds the issue to the matrix and aggregates
+
+        Args:
+          issue (obj): Jira issue expanded by changelog or its raw dict
+          changelog (dict, optional): compact changelog, the issue changelog by default
+
+        Returns:
+          dict: status -> seconds
+        """
+
+        raw = getattr(issue, 'raw', issue)
+        durations = self.durations(raw, changelog)
+        self.count += 1
+        if self.keep_issues:
+            self.issues[raw['key']] = durations
+        for field in self.group_by:
+            for value in field_values(raw, field):
+                group = self.groups[field].setdefault(value, {})
+                for status, seconds in durations.items():
+                    total = group.setdefault(status, [0, 0])
+                    total[0] += seconds
+                    total[1] += 1
+        return durations
+
+    def aggregate(self, field):
+        """Function returns durations aggregated by the field
+
+        Args:
+          field (str): one of group_by fields
+
+        Returns:
+          dict: value -> status -> dict of total, count and average seconds
+        """
+
+        return dict((value, dict((status, {'total': total, 'count': count,
+                                           'average': total / count})
+                                 for status, (total, count) in statuses.items()))
+                    for value, statuses in self.groups[field].items())
+
+
+class TDigest(object):
+    """TDigest class, mergeable sketch of a distribution for quantile estimation
+        Attributes:
+            compression (int, optional): accuracy and size parameter, 100 by default
+            centroids (list): list of [mean, weight] sorted by mean
+            count (float): total weight of added values
+            min (float): minimal added value
+            max (float): maximal added value
+    """
+
+    def __init__(self, compression=100):
+        """Initialization"""
+        self.compression = compression
+        self.centroids = []
+        self.buffer = []
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value, weight=1):
+        """Function adds value to the sketch
+
+        Args:
+          value (float): value like duration in seconds
+          weight (float, optional): weight of the value, 1 by default
+        """
+
+        self.buffer.append([float(value), weight])
+        self.count += weight
+        if self.min is None or value < self.min:
+            self.min = float(value)
+        if self.max is None or value > self.max:
+            self.max = float(value)
+        if len(self.buffer) >= self.compression * 5:
+            self.compress()
+
+    def scale(self, quantile):
+        """Function returns scale value of the quantile"""
+
+        return self.compression / (2 * math.pi) * math.asin(2 * quantile - 1)
+
+    def scale_inverse(self, scale):
+        """Function returns quantile of the scale value"""
+
+        return (math.sin(min(scale * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def compress(self):
+        """Function merges buffered values into centroids"""
+
+        if not self.buffer:
+            return
+        points = sorted(self.centroids + self.buffer)
+        self.buffer = []
+        total = float(sum(weight for _, weight in points))
+        centroids = []
+        mean, weight = points[0]
+        done = 0
+        limit = self.scale_inverse(self.scale(0) + 1) * total
+        for point_mean, point_weight in points[1:]:
+            if done + weight + point_weight <= limit:
+                mean += (point_mean - mean) * point_weight / (weight + point_weight)
+                weight += point_weight
+            else:
+                centroids.append([mean, weight])
+                done += weight
+                limit = self.scale_inverse(self.scale(done / total) + 1) * total
+                mean, weight = point_mean, point_weight
+        centroids.append([mean, weight])
+        self.centroids = centroids
+
+    def quantile(self, quantile):
+        """Function returns estimated value of the quantile
+
+        Args:
+          quantile (float): quantile from 0 to 1, e.g. 0.99
+
+        Returns:
+          float: value or None for empty sketch
+        """
+
+        self.compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+        index = quantile * self.count
+        first_mean, first_weight = self.centroids[0]
+        if index < first_weight / 2.0:
+            return self.min + (first_mean - self.min) * index / (first_weight / 2.0)
+        done = 0
+        for (left, left_weight), (right, right_weight) in zip(self.centroids, self.centroids[1:]):
+            left_center = done + left_weight / 2.0
+            right_center = done + left_weight + right_weight / 2.0
+            if index <= right_center:
+                return left + (right - left) * (index - left_center) / (right_center - left_center)
+            done += left_weight
+        last_mean, last_weight = self.centroids[-1]
+        tail = (index - (self.count - last_weight / 2.0)) / (last_weight / 2.0)
+        return last_mean + (self.max - last_mean) * min(tail, 1)
+
+    def merge(self, other):
+        """Function adds all values of the other sketch
+
+        Args:
+          other (obj): TDigest object
+        """
+
+        other.compress()
+        self.buffer.extend([mean, weight] for mean, weight in other.centroids)
+        self.count += other.count
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        self.compress()
+
+    def to_dict(self):
+        """Function returns serializable form of the sketch"""
+
+        self.compress()
+        return {'compression': self.compression, 'centroids': self.centroids,
+                'count': self.count, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Function returns sketch restored from serializable form"""
+
+        digest = cls(data['compression'])
+        digest.centroids = [list(centroid) for centroid in data['centroids']]
+        digest.count = data['count']
+        digest.min = data['min']
+        digest.max = data['max']
+        return digest
+
+
+class SketchSet(object):
+    """SketchSet class, TDigest sketches keyed by version, project or other group
+        Attributes:
+            compression (int, optional): compression of created sketches, 100 by default
+            sketches (dict): group -> TDigest object
+    """
+
+    def __init__(self, compression=100):
+        """Initialization"""
+        self.compression = compression
+        self.sketches = {}
+
+    def add(self, group, value, weight=1):
+        """Function adds value to the sketch of the group"""
+
+        if group not in self.sketches:
+            self.sketches[group] = TDigest(self.compression)
+        self.sketches[group].add(value, weight)
+
+    def merge(self, other):
+        """Function merges sketches of the other set
+
+        Args:
+          other (obj): SketchSet object
+        """
+
+        for group, digest in other.sketches.items():
+            if group not in self.sketches:
+                self.sketches[group] = TDigest(self.compression)
+            self.sketches[group].merge(digest)
+
+    def quantiles(self, quantiles=(0.5, 0.9, 0.99)):
+        """Function returns estimated quantiles of every group
+
+        Args:
+          quantiles (tuple): quantiles from 0 to 1
+
+        Returns:
+          dict: group -> quantile -> value
+        """
+
+        return dict((group, dict((quantile, digest.quantile(quantile))
+                                 for quantile in quantiles))
+                    for group, digest in self.sketches.items())
+
+    def to_dict(self):
+        """Function returns serializable form of the set
+
+        Sketches are stored as [group, sketch] pairs, so None group of issues
+        without the field is not turned into "null" string key.
+        """
+
+        return {'compression': self.compression,
+                'sketches': [[group, digest.to_dict()]
+                             for group, digest in self.sketches.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Function returns set restored from serializable form"""
+
+        sketches = data['sketches']
+        if isinstance(sketches, dict):
+            sketches = sketches.items()
+        sketch_set = cls(data['compression'])
+        sketch_set.sketches = dict((group, TDigest.from_dict(digest))
+                                   for group, digest in sketches)
+        return sketch_set
+
+    def dump(self, file_name):
+        """Function writes the set to JSON file"""
+
+        with open(file_name, 'w') as sketch_file:
+            json.dump(self.to_dict(), sketch_file)
+
+    @classmethod
+    def load(cls, file_name):
+        """Function reads the set from JSON file"""
+
+        with open(file_name, 'r') as sketch_file:
+            return cls.from_dict(json.load(sketch_file))
+
+
+class ReleaseMetrics(object):
+    """ReleaseMetrics class, materialized per-version metrics updated incrementally
+        Attributes:
+            path (str): JSON file keeping the state between runs
+            crit_priorities (list, optional): priorities of critical bugs, Critical and Blocker by default
+            reopen_status (str, optional): status treated as reopening, Reopened by default
+            overlap (int, optional): minutes subtracted from the last run time, 60 by default
+            state (dict): last_run, release_dates, issues facts and versions aggregates
+    """
+
+    metrics = ['bugs', 'crit_bugs', 'reopened_bugs', 'reopen_count', 'prod_bugs',
+               'bugfixes', 'tasks', 'resolved', 'resolution_time']
+
+    def __init__(self, path, crit_priorities=('Critical', 'Blocker'),
+                 reopen_status='Reopened', overlap=60):
+        """Initialization"""
+        self.path = path
+        self.crit_priorities = list(crit_priorities)
+        self.reopen_status = reopen_status
+        self.overlap = overlap
+        self.state = {'last_run': None, 'release_dates': {}, 'issues': {}, 'versions': {}}
+        if os.path.exists(path):
+            with open(path, 'r') as state_file:
+                self.state = json.load(state_file)
+
+    def save(self):
+        """Function writes the state atomically"""
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path + '.tmp', 'w') as state_file:
+            json.dump(self.state, state_file)
+        os.rename(self.path + '.tmp', self.path)
+
+    def get_facts(self, issue, changelog=None):
+        """Function returns facts of the issue needed for metrics
+
+        Args:
+          issue (obj): Jira issue or its raw dict
+          changelog (dict, optional): compact changelog, the issue changelog by default
+
+        Returns:
+          dict: bug, crit, reopen_count, created, resolution_time, versions and fix_versions
+        """
+
+        raw = getattr(issue, 'raw', issue)
+        fields = raw['fields']
+        compact = compact_issue(changelog if changelog is not None else raw)
+        reopen_count = sum(1 for _, _, items in compact['histories']
+                           for field, _, to_string in items
+                           if field == 'status' and to_string == self.reopen_status)
+        resolution_time = None
+        if fields.get('resolutiondate'):
+            resolution_time = (dateutil.parser.parse(fields['resolutiondate']) -
+                               dateutil.parser.parse(fields['created'])).total_seconds()
+        return {'bug': field_values(raw, 'issuetype') == ['Bug'],
+                'crit': field_values(raw, 'priority')[0] in self.crit_priorities,
+                'reopen_count': reopen_count,
+                'created': fields['created'],
+                'resolution_time': resolution_time,
+                'versions': [name for name in field_values(raw, 'versions') if name],
+                'fix_versions': [name for name in field_values(raw, 'fixVersions') if name]}
+
+    def get_contribution(self, facts, release_dates):
+        """Function returns contribution of the issue to version aggregates
+
+        Args:
+          facts (dict): issue facts, see get_facts
+          release_dates (dict): version -> release date
+
+        Returns:
+          dict: version -> metric -> value
+        """
+
+        contribution = {}
+
+        def add(version, metric, value=1):
+            """Internal function adding the value to the metric"""
+            if value:
+                metrics = contribution.setdefault(version, {})
+                metrics[metric] = metrics.get(metric, 0) + value
+
+        if facts['bug']:
+            for version in facts['versions']:
+                add(version, 'bugs')
+                add(version, 'crit_bugs', facts['crit'])
+                add(version, 'reopened_bugs', facts['reopen_count'] > 0)
+                add(version, 'reopen_count', facts['reopen_count'])
+                release_date = release_dates.get(version)
+                if release_date and dateutil.parser.parse(facts['created']).date() >= \
+                   dateutil.parser.parse(release_date).date():
+                    add(version, 'prod_bugs')
+        for version in facts['fix_versions']:
+            add(version, 'bugfixes' if facts['bug'] else 'tasks')
+            if facts['resolution_time'] is not None:
+                add(version, 'resolved')
+                add(version, 'resolution_time', facts['resolution_time'])
+        return contribution
+
+    def apply(self, contribution, sign):
+        """Function adds or subtracts the contribution from version aggregates"""
+
+        for version, metrics in contribution.items():
+            aggregates = self.state['versions'].setdefault(version, {})
+            for metric, value in metrics.items():
+                aggregates[metric] = aggregates.get(metric, 0) + sign * value
+                if not aggregates[metric]:
+                    del aggregates[metric]
+            if not aggregates:
+                del self.state['versions'][version]
+
+    def update(self, issues, changelogs=None):
+        """Function recomputes aggregates affected by changed issues
+
+        Args:
+          issues (iterable): changed Jira issues with changelog or raw dicts
+          changelogs (dict, optional): key -> compact changelog replacing issue changelog
+
+        Returns:
+          int: number of updated issues
+        """
+
+        release_dates = self.state['release_dates']
+        count = 0
+        for issue in issues:
+            raw = getattr(issue, 'raw', issue)
+            facts = self.get_facts(raw, (changelogs or {}).get(raw['key']))
+            old_facts = self.state['issues'].get(raw['key'])
+            if old_facts is not None:
+                self.apply(self.get_contribution(old_facts, release_dates), -1)
+            self.apply(self.get_contribution(facts, release_dates), 1)
+            self.state['issues'][raw['key']] = facts
+            count += 1
+        return count
+
+    def remove(self, keys):
+        """Function removes deleted issues from aggregates
+
+        Args:
+          keys (list): issue keys
+        """
+
+        for key in keys:
+            facts = self.state['issues'].pop(key, None)
+            if facts is not None:
+                self.apply(self.get_contribution(facts, self.state['release_dates']), -1)
+
+    def set_release_dates(self, release_dates):
+        """Function updates release dates recomputing production bugs of changed versions
+
+        Args:
+          release_dates (dict): version -> release date
+        """
+
+        old_dates = self.state['release_dates']
+        changed = set(version for version in set(old_dates) | set(release_dates)
+                      if old_dates.get(version) != release_dates.get(version))
+        if not changed:
+            return
+        for facts in self.state['issues'].values():
+            if facts['bug'] and changed & set(facts['versions']):
+                self.apply(self.get_contribution(facts, old_dates), -1)
+                self.apply(self.get_contribution(facts, release_dates), 1)
+        self.state['release_dates'] = dict(release_dates)
+
+    def refresh(self, connector, project, full=False):
+        """Function fetches issues updated since the last run and updates aggregates
+
+        All updated issues are fetched regardless of the connector limit.
+        The last run is the latest update time of fetched issues, Jira returns
+        it in the timezone of the user, the same one it uses in JQL dates.
+        Deleted issues are not reported by Jira search, use remove for them.
+
+        Args:
+          connector (obj): JiraConnector object
+          project (str): Jira project key
+          full (bool, optional): recompute all issues of the project
+
+        Returns:
+          int: number of updated issues
+        """
+
+        self.set_release_dates(dict(
+            (version.name, getattr(version, 'releaseDate', None))
+            for version in connector.get_project_versions(project)))
+        filter_string = 'project="%s"' % project
+        last_run = None
+        if self.state['last_run'] and not full:
+            since = dateutil.parser.parse(self.state['last_run'])
+            if since.tzinfo is not None:
+                last_run = since
+            since -= datetime.timedelta(minutes=self.overlap)
+            filter_string += ' and updated >= "%s"' % since.strftime('%Y/%m/%d %H:%M')
+        issues = connector.iter_issues(
+            filter_string, expand='changelog', limit=sys.maxsize,
+            fields='issuetype,priority,versions,fixVersions,created,resolutiondate,updated')
+        count = 0
+        for issue in issues:
+            count += self.update([issue], {issue.key: connector.get_changelog(issue)})
+            updated = issue.raw['fields'].get('updated')
+            if updated:
+                updated = dateutil.parser.parse(updated)
+                if last_run is None or updated > last_run:
+                    last_run = updated
+        if last_run is not None:
+            self.state['last_run'] = last_run.isoformat()
+        self.save()
+        return count
+
+    def get_version_metrics(self, version):
+        """Function returns metrics of the version
+
+        Args:
+          version (str): version name
+
+        Returns:
+          dict: bugs, crit_bugs, reopened_bugs, reopen_count, prod_bugs, bugfixes,
+            tasks and average resolution_time in seconds
+        """
+
+        aggregates = self.state['versions'].get(version, {})
+        result = dict((metric, aggregates.get(metric, 0)) for metric in self.metrics)
+        result['resolution_time'] = None
+        if result['resolved']:
+            result['resolution_time'] = aggregates['resolution_time'] / result['resolved']
+        return result
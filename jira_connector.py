@@ -23,13 +23,27 @@ for issue in issues:
 """
 
 import re
+import os
+import sys
+import json
+import time
 import datetime
+import atexit
+import cProfile
+import pstats
+import functools
+import threading
+import Queue
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 from distutils.version import LooseVersion
 import operator
 import itertools
 import dateutil.parser
 from jira import JIRA
 from jira import JIRAError
+from jira.resources import Issue
+from jira_analytics import TimeInStatus, SketchSet, field_values, compact_issue
 
 __author__ = "Alexander Grechin"
 __version__ = "0.4"
@@ -40,6 +54,446 @@ __license__ = "GNU GPL V2"
 # import httplib
 # httplib.HTTPConnection.debuglevel=1
 
+JQL_KEYWORDS = set(['and', 'or', 'not', 'in', 'is', 'was', 'changed', 'order', 'by',
+                    'asc', 'desc', 'empty', 'null'])
+JQL_FIELD_ALIASES = {'type': 'issuetype', 'version': 'affectedversion',
+                     'affectsversion': 'affectedversion', 'fixversions': 'fixversion',
+                     'versions': 'affectedversion', 'components': 'component'}
+JQL_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|!=|<=|>=|!~|[=<>~(),]|[^\s"\'=<>!~(),]+')
+
+
+def normalize_jql(jql):
+    """Function returns canonical form of JQL filter
+
+    Whitespace is collapsed and removed around operators, keywords are
+    lowercased, quoted values are kept as is.
+
+    Args:
+      jql (str): Jira JQL filter
+
+    Returns:
+      str: normalized JQL filter
+    """
+
+    result = ''
+    previous = None
+    for token in JQL_TOKEN.findall(jql):
+        if token.lower() in JQL_KEYWORDS:
+            token = token.lower()
+        word = token[0] not in '=<>!~(),'
+        if previous and word:
+            result += ' '
+        result += token
+        previous = word
+    return result
+
+
+def normalize_field(name):
+    """Function returns field name comparable between JQL and changelog items
+
+    Args:
+      name (str): field name like "Fix Version" or fixVersion
+
+    Returns:
+      str: lowercased name without quotes and spaces
+    """
+
+    name = re.sub(r'[\s"\']', '', name).lower()
+    return JQL_FIELD_ALIASES.get(name, name)
+
+
+def get_jql_fields(jql):
+    """Function returns set of fields used in JQL conditions
+
+    Args:
+      jql (str): Jira JQL filter
+
+    Returns:
+      set: normalized field names, see normalize_field
+    """
+
+    fields = set()
+    tokens = JQL_TOKEN.findall(jql)
+    for index, token in enumerate(tokens[:-1]):
+        following = tokens[index + 1].lower()
+        if token.lower() not in JQL_KEYWORDS and token not in '(),' and \
+           (following in ('=', '!=', '<', '>', '<=', '>=', '~', '!~') or
+            following in ('in', 'not', 'is', 'was', 'changed')):
+            fields.add(normalize_field(token))
+    return fields
+
+
+class QueryCache(object):
+    """QueryCache class, bounded in-memory cache with TTL and LRU eviction
+        Attributes:
+            size (int): Maximal number of cached results
+            ttl (int): Time to live of a result in seconds
+            stats (dict): hits, misses and evictions counters
+    """
+
+    def __init__(self, size=100, ttl=300):
+        """Initialization"""
+        self.size = int(size)
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key):
+        """Function returns cached value or None if it is absent or expired"""
+
+        with self.lock:
+            if key in self.items:
+                expires, value = self.items.pop(key)
+                if self.ttl is None or expires > time.time():
+                    self.items[key] = (expires, value)
+                    self.stats['hits'] += 1
+                    return value
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key, value):
+        """Function stores value and evicts the least recently used ones"""
+
+        with self.lock:
+            self.items.pop(key, None)
+            expires = time.time() + self.ttl if self.ttl is not None else None
+            self.items[key] = (expires, value)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, predicate=None):
+        """Function removes values which keys match the predicate, all by default
+
+        Returns:
+          int: number of removed values
+        """
+
+        with self.lock:
+            keys = [key for key in self.items if predicate is None or predicate(key)]
+            for key in keys:
+                del self.items[key]
+            return len(keys)
+
+    def update(self, function):
+        """Function replaces every value by function(key, value), None removes the value
+
+        Returns:
+          int: number of changed or removed values
+        """
+
+        changed = 0
+        with self.lock:
+            for key in list(self.items):
+                expires, value = self.items[key]
+                result = function(key, value)
+                if result is None:
+                    del self.items[key]
+                elif result is not value:
+                    self.items[key] = (expires, result)
+                else:
+                    continue
+                changed += 1
+        return changed
+
+
+class SingleFlight(object):
+    """SingleFlight class, shares one request between identical concurrent calls
+        Attributes:
+            ttl (int): Time in seconds the result is reused by following calls
+            stats (dict): requests, coalesced and memo_hits counters
+    """
+
+    def __init__(self, ttl=2):
+        """Initialization"""
+        self.ttl = ttl
+        self.calls = {}
+        self.memo = {}
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'coalesced': 0, 'memo_hits': 0}
+
+    def do(self, key, function, *args, **kwargs):
+        """Function returns result of the function call shared by the key
+
+        Args:
+          key (tuple): request identifier
+          function (function): request function
+
+        Returns:
+          obj: function result
+        """
+
+        owner = False
+        with self.lock:
+            if key in self.memo:
+                expires, result = self.memo[key]
+                if expires > time.time():
+                    self.stats['memo_hits'] += 1
+                    return result
+                del self.memo[key]
+            call = self.calls.get(key)
+            if call is not None:
+                self.stats['coalesced'] += 1
+            else:
+                call = {'event': threading.Event(), 'result': None, 'error': None,
+                        'done': False}
+                self.calls[key] = call
+                self.stats['requests'] += 1
+                owner = True
+        if not owner:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error'][0], call['error'][1], call['error'][2]
+            return call['result']
+        try:
+            call['result'] = function(*args, **kwargs)
+            call['done'] = True
+        except BaseException:
+            call['error'] = sys.exc_info()
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                if call['done'] and self.ttl:
+                    now = time.time()
+                    if len(self.memo) >= 1000:
+                        for expired in [memo_key for memo_key, (expires, _) in self.memo.items()
+                                        if expires <= now]:
+                            del self.memo[expired]
+                    self.memo[key] = (now + self.ttl, call['result'])
+            call['event'].set()
+        return call['result']
+
+    def forget(self, predicate=None):
+        """Function removes memorized results which keys match the predicate, all by default"""
+
+        with self.lock:
+            for key in [key for key in self.memo if predicate is None or predicate(key)]:
+                del self.memo[key]
+
+
+class Profiler(object):
+    """Profiler class, collects per-phase timings, peak memory growth and cProfile stats
+        Attributes:
+            profile_file (str): path to cProfile stats file
+            report_file (str): path to text report with per-phase timings
+            phases (dict): phase -> calls, time and maximal growth of peak memory
+    """
+
+    def __init__(self, profile_file='jira_connector.prof',
+                 report_file='jira_connector_profile.txt'):
+        """Initialization"""
+        self.profile_file = profile_file
+        self.report_file = report_file
+        self.phases = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started = time.time()
+        try:
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        except ImportError:
+            self.tracemalloc = None
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def get_memory(self):
+        """Function returns peak memory of the process in bytes"""
+
+        if self.tracemalloc is not None:
+            return self.tracemalloc.get_traced_memory()[1]
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def wrap(self, obj, name, phase):
+        """Function replaces the method of the object by the timed one
+
+        Nested calls of the same phase are counted once. The memory of
+        the phase is the largest rise of the process peak memory during
+        one call, so phases not allocating new memory report zero.
+
+        Args:
+          obj (obj): object owning the method
+          name (str): method name
+          phase (str): phase name in the report
+        """
+
+        method = getattr(obj, name)
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            """Internal timed method"""
+            depth = getattr(self.local, phase, 0)
+            if depth:
+                return method(*args, **kwargs)
+            setattr(self.local, phase, 1)
+            start_memory = self.get_memory()
+            start = time.time()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.time() - start
+                setattr(self.local, phase, 0)
+                memory = self.get_memory() - start_memory
+                with self.lock:
+                    stats = self.phases.setdefault(phase, {'calls': 0, 'time': 0.0, 'memory': 0})
+                    stats['calls'] += 1
+                    stats['time'] += elapsed
+                    stats['memory'] = max(stats['memory'], memory)
+
+        setattr(obj, name, timed)
+
+    def report(self):
+        """Function writes cProfile stats and per-phase report
+
+        Returns:
+          str: report text
+        """
+
+        self.profile.disable()
+        self.profile.dump_stats(self.profile_file)
+        lines = ['{0:20}|{1:>10}|{2:>12}|{3:>12}|{4:>14}'.format(
+            'PHASE', 'CALLS', 'TOTAL, S', 'AVERAGE, MS', 'PEAK GROWTH, MB')]
+        with self.lock:
+            phases = dict((phase, dict(stats)) for phase, stats in self.phases.items())
+        if 'search' in phases and 'network' in phases:
+            phases['conversion'] = {
+                'calls': phases['search']['calls'],
+                'time': max(phases['search']['time'] - phases['network']['time'], 0),
+                'memory': phases['search']['memory']}
+        for phase, stats in sorted(phases.items(), key=lambda item: -item[1]['time']):
+            lines.append('{0:20}|{1:>10}|{2:>12.3f}|{3:>12.3f}|{4:>14.1f}'.format(
+                phase, stats['calls'], stats['time'],
+                stats['time'] * 1000 / max(stats['calls'], 1),
+                stats['memory'] / 1048576.0))
+        lines.append('Total time: %.3f s, peak memory: %.1f MB, profile: %s' % (
+            time.time() - self.started, self.get_memory() / 1048576.0, self.profile_file))
+        report = '\n'.join(lines) + '\n'
+        with open(self.report_file, 'w') as report_file:
+            report_file.write(report)
+        self.profile.enable()
+        return report
+
+
+class Checkpoint(object):
+    """Checkpoint class, keeps progress and fetched pages of a long extraction on disk
+        Attributes:
+            path (str): checkpoint directory
+            state (dict): filter, fields, expand, count, next page, completed and failed pages
+    """
+
+    def __init__(self, path, filter_str, fields=None, expand=None, count=100, keyset=None):
+        """Initialization"""
+        self.path = path
+        query = {'filter': filter_str, 'fields': fields, 'expand': expand,
+                 'count': count, 'keyset': keyset}
+        self.cursors = {}
+        self.lock = threading.RLock()
+        self.state = None
+        if os.path.exists(self.state_file()):
+            with open(self.state_file(), 'r') as state_file:
+                self.state = json.load(state_file)
+            if any(self.state.get(key) != value for key, value in query.items()):
+                self.state = None
+        if self.state is None:
+            if not os.path.exists(path):
+                os.makedirs(path)
+            for name in os.listdir(path):
+                if name.startswith('page_'):
+                    os.remove(os.path.join(path, name))
+            self.state = dict(query, next=0, cursor=None, completed=[], failed=[], done=False)
+            self.save()
+
+    def state_file(self):
+        """Function returns path of the state file"""
+
+        return os.path.join(self.path, 'state.json')
+
+    def page_file(self, page):
+        """Function returns path of the page file"""
+
+        return os.path.join(self.path, 'page_%06d.json' % page)
+
+    def dump(self, file_name, data):
+        """Function writes JSON data atomically"""
+
+        temp_name = file_name + '.tmp'
+        with open(temp_name, 'w') as temp_file:
+            json.dump(data, temp_file)
+        os.rename(temp_name, file_name)
+
+    def save(self):
+        """Function writes the state"""
+
+        with self.lock:
+            self.dump(self.state_file(), self.state)
+
+    def pages(self):
+        """Function yields completed pages stored on disk
+
+        Returns:
+          generator: (page, list of raw issues) tuples
+        """
+
+        for page in sorted(self.state['completed']):
+            if not os.path.exists(self.page_file(page)):
+                continue
+            with open(self.page_file(page), 'r') as page_file:
+                yield page, json.load(page_file)
+
+    def save_page(self, page, issues, cursor=None):
+        """Function stores fetched page and keyset cursor following it"""
+
+        self.dump(self.page_file(page), [issue.raw for issue in issues])
+        if cursor is not None:
+            with self.lock:
+                self.cursors[page] = cursor
+
+    def complete(self, page):
+        """Function marks the page as processed and moves the position forward"""
+
+        with self.lock:
+            self.state['next'] = max(self.state['next'], page + 1)
+            if page in self.cursors:
+                self.state['cursor'] = self.cursors.pop(page)
+            if page not in self.state['completed']:
+                self.state['completed'].append(page)
+            if page in self.state['failed']:
+                self.state['failed'].remove(page)
+            self.save()
+
+    def fail(self, page):
+        """Function marks the page as failed to retry it later
+
+        The position is not moved, pages fetched ahead of the failed one may
+        still wait for processing, the position follows completed pages only.
+        """
+
+        with self.lock:
+            if page not in self.state['failed']:
+                self.state['failed'].append(page)
+            self.save()
+
+    def discard(self, page):
+        """Function forgets the failed page found empty on retry"""
+
+        with self.lock:
+            if page in self.state['failed']:
+                self.state['failed'].remove(page)
+            self.save()
+
+    def finish(self):
+        """Function marks the extraction as done if no page failed"""
+
+        with self.lock:
+            if not self.state['failed']:
+                self.state['done'] = True
+                self.save()
+
+
 # pylint: disable=R0904
 class JiraConnector(object):
     """JiraConnector class
@@ -48,8 +502,33 @@ class JiraConnector(object):
             limit (int, optional): Global limit of captured issues, 100 by default
             count (int, optional): Number of issues captured in the each iteration, 100 by deafult
             config (str): path to config file in YAML format, which add and replace direct values
+            cache_size (int, optional): Number of list_all results kept in memory, 0 (disabled) by default
+            cache_ttl (int, optional): Time to live of cached results in seconds, 300 by default
+            retries (int, optional): Number of retries of failed requests, 3 by default
+            retry_delay (int, optional): Delay before the first retry in seconds, 1 by default
+            pagination (str, optional): offset (startAt) or keyset pagination, offset by default
+            keyset_field (str, optional): id or key field ordering keyset pages, id by default
+            prefetch (int, optional): Number of pages fetched while the callback
+                of handle_all_issues is running, 0 (disabled) by default
+            workers (int, optional): Number of concurrent requests of bulk methods, 4 by default
+            max_jql_length (int, optional): Maximal length of generated key filters, 2000 by default
+            memo_ttl (int, optional): Time in seconds issues, transitions and versions
+                are reused by following identical requests, 2 by default
+            profile (bool, optional): Profile fetching, changelog and date methods,
+                also enabled by JIRA_CONNECTOR_PROFILE environment variable even if false
+            profile_file (str, optional): cProfile stats file, jira_connector.prof by default
+            profile_report_file (str, optional): per-phase report file,
+                jira_connector_profile.txt by default
     """
 
+    profile_phases = {
+        'fetch': ['handle_all_issues', 'get_issues_by_keys', 'get_changelogs'],
+        'search': ['search_page'],
+        'changelog': ['get_changelog', 'get_last_resolver', 'get_reopen_list',
+                      'get_reopen_count', 'get_resolution_date'],
+        'dates': ['parse_date', 'convert_date', 'get_total_date', 'get_average_date'],
+    }
+
     url = 'https://jira.atlassian.com'
 
     def __init__(self, **kwargs):
@@ -81,6 +560,35 @@ class JiraConnector(object):
         self.limit = int(self.limit)
         self.count = int(self.count)
         self.options = {'server': self.url}
+        if 'cache_size' not in self.__dict__ or self.cache_size is None:
+            self.cache_size = 0
+        if 'cache_ttl' not in self.__dict__:
+            self.cache_ttl = 300
+        self.cache = QueryCache(self.cache_size, self.cache_ttl)
+        if 'retries' not in self.__dict__ or self.retries is None:
+            self.retries = 3
+        if 'retry_delay' not in self.__dict__ or self.retry_delay is None:
+            self.retry_delay = 1
+        if 'pagination' not in self.__dict__ or self.pagination is None:
+            self.pagination = 'offset'
+        if 'keyset_field' not in self.__dict__ or self.keyset_field is None:
+            self.keyset_field = 'id'
+        if 'prefetch' not in self.__dict__ or self.prefetch is None:
+            self.prefetch = 0
+        self.prefetch = int(self.prefetch)
+        if 'workers' not in self.__dict__ or self.workers is None:
+            self.workers = 4
+        if 'max_jql_length' not in self.__dict__ or self.max_jql_length is None:
+            self.max_jql_length = 2000
+        if 'memo_ttl' not in self.__dict__ or self.memo_ttl is None:
+            self.memo_ttl = 2
+        self.flight = SingleFlight(self.memo_ttl)
+        # the environment variable enables profiling regardless of the config
+        self.profile = bool(self.__dict__.get('profile')) or \
+            os.environ.get('JIRA_CONNECTOR_PROFILE', '0') not in ('', '0')
+        self.profiler = None
+        if self.profile:
+            self.start_profiling()
         if 'username' in self.__dict__ and 'password' in self.__dict__:
             self.basic_auth = (self.username, self.password)
 
@@ -90,19 +598,69 @@ class JiraConnector(object):
 
     def connect(self):
         """Implicitly connect to Jira"""
-        try:
-            if 'basic_auth' in self.__dict__:
-                self.jira = JIRA(options=self.options, basic_auth=self.basic_auth)
-            else:
-                self.jira = JIRA(options=self.options)
-            #self.jira = JIRA(options=self.options)
-        except JIRAError as e:
-            m = re.search('<title>(.+)</title>', e.response.content)
-            if m:
-                print e.status_code, m.group(1)
-            if e.message:
-                print e.status_code, e.message
-            exit()
+        attempt = 0
+        while True:
+            try:
+                if 'basic_auth' in self.__dict__:
+                    self.jira = JIRA(options=self.options, basic_auth=self.basic_auth)
+                else:
+                    self.jira = JIRA(options=self.options)
+                #self.jira = JIRA(options=self.options)
+                if self.profiler is not None:
+                    self.profiler.wrap(self.jira._session, 'request', 'network')
+                return
+            except JIRAError as e:
+                attempt += 1
+                if attempt <= self.retries and self.is_transient_error(e):
+                    time.sleep(self.retry_delay * attempt)
+                    continue
+                if e.response is not None:
+                    m = re.search('<title>(.+)</title>', e.response.content)
+                    if m:
+                        print e.status_code, m.group(1)
+                if e.message:
+                    print e.status_code, e.message
+                exit()
+
+    def start_profiling(self):
+        """Function wraps fetching, changelog and date methods by the profiler
+
+        The report is written when the process exits or by profile_report.
+        """
+
+        self.profiler = Profiler(
+            self.__dict__.get('profile_file') or 'jira_connector.prof',
+            self.__dict__.get('profile_report_file') or 'jira_connector_profile.txt')
+        for phase, names in self.profile_phases.items():
+            for name in names:
+                self.profiler.wrap(self, name, phase)
+        if 'jira' in self.__dict__:
+            self.profiler.wrap(self.jira._session, 'request', 'network')
+        atexit.register(self.profiler.report)
+
+    def profile_report(self):
+        """Function writes profiling report and cProfile stats
+
+        Returns:
+          str: report text or None if profiling is disabled
+        """
+
+        if self.profiler is None:
+            return None
+        return self.profiler.report()
+
+    def is_transient_error(self, error):
+        """Function checks if the failed request is worth to retry
+
+        Args:
+          error (obj): JIRAError or IOError exception
+
+        Returns:
+          bool: True for network errors, throttling and server errors
+        """
+
+        status_code = getattr(error, 'status_code', None)
+        return status_code is None or status_code == 429 or status_code >= 500
 
     def get_items_from_description(self, issue, regex):
         """Function returns list of items from issue description by regexp
@@ -177,6 +735,106 @@ class JiraConnector(object):
                 items.append(m.group(1))
         return items
 
+    def iter_attachments(self, filter_string, regex=None, min_size=None, max_size=None):
+        """Function yields attachment metadata of issues from the filter
+
+        Only attachment field is requested, issues are not expanded.
+
+        Args:
+          filter_string (str): Jira JQL filter
+          regex (str, optional): filename filter
+          min_size (int, optional): minimal size in bytes
+          max_size (int, optional): maximal size in bytes
+
+        Returns:
+          generator: dicts with issue, id, filename, size, mimeType and content keys
+        """
+
+        for issue in self.iter_issues(filter_string, fields='attachment'):
+            for attach in issue.raw['fields'].get('attachment') or []:
+                size = attach.get('size', 0)
+                if regex is not None and not re.search(regex, attach['filename']):
+                    continue
+                if (min_size is not None and size < min_size) or \
+                   (max_size is not None and size > max_size):
+                    continue
+                yield {'issue': issue.key,
+                       'id': attach['id'],
+                       'filename': attach['filename'],
+                       'size': size,
+                       'mimeType': attach.get('mimeType'),
+                       'content': attach['content']}
+
+    def download_attachment(self, attachment, path, chunk_size=65536):
+        """Function streams the attachment to disk by chunks
+
+        The file is named by attachment id, so it is downloaded once.
+        Partial download is kept in .part file and resumed by Range request.
+
+        Args:
+          attachment (dict): attachment metadata from iter_attachments
+          path (str): destination directory
+          chunk_size (int, optional): size of written chunks, 64KB by default
+
+        Returns:
+          str: path to the downloaded file
+        """
+
+        file_name = os.path.join(path, '%s_%s' % (
+            attachment['id'], os.path.basename(attachment['filename'].replace('\\', '/'))))
+        if os.path.exists(file_name) and os.path.getsize(file_name) == attachment['size']:
+            return file_name
+        part_name = file_name + '.part'
+        headers = {}
+        offset = os.path.getsize(part_name) if os.path.exists(part_name) else 0
+        if 0 < offset < attachment['size']:
+            headers['Range'] = 'bytes=%d-' % offset
+        response = self.jira._session.get(attachment['content'], headers=headers, stream=True)
+        try:
+            response.raise_for_status()
+            mode = 'ab' if response.status_code == 206 else 'wb'
+            with open(part_name, mode) as part_file:
+                for chunk in response.iter_content(chunk_size):
+                    part_file.write(chunk)
+        finally:
+            response.close()
+        os.rename(part_name, file_name)
+        return file_name
+
+    def download_attachments(self, filter_string, path, regex=None, min_size=None,
+                             max_size=None):
+        """Function downloads attachments of issues from the filter concurrently
+
+        Attachments are filtered by metadata before downloading, files are
+        fetched by workers threads and streamed to disk by chunks,
+        see download_attachment.
+
+        Args:
+          filter_string (str): Jira JQL filter
+          path (str): destination directory
+          regex (str, optional): filename filter
+          min_size (int, optional): minimal size in bytes
+          max_size (int, optional): maximal size in bytes
+
+        Returns:
+          dict: attachment id -> path to the downloaded file
+        """
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+        attachments = {}
+        for attachment in self.iter_attachments(filter_string, regex, min_size, max_size):
+            attachments[attachment['id']] = attachment
+        if not attachments:
+            return {}
+        pool = ThreadPool(min(self.workers, len(attachments)))
+        try:
+            files = pool.map(lambda attachment: self.download_attachment(attachment, path),
+                             attachments.values())
+        finally:
+            pool.terminate()
+        return dict(zip(attachments.keys(), files))
+
     def get_issue_by_key(self, key):
         """Function returns issue for a key
 
@@ -187,7 +845,62 @@ class JiraConnector(object):
           obj: Jira issue object
         """
 
-        return self.jira.issue(key)
+        return self.get_issue(key)
+
+    def get_issue(self, key, expand=None):
+        """Function returns issue sharing the request with identical concurrent calls
+
+        Args:
+          key (str): An issue key
+          expand (str, optional): comma separated list of entities to expand
+
+        Returns:
+          obj: Jira issue object
+        """
+
+        return self.flight.do(('issue', key, expand), self.jira.issue, key, expand=expand)
+
+    def get_transitions(self, issue):
+        """Function returns available transitions of the issue sharing the request
+
+        Args:
+          issue (obj): Jira issue object
+
+        Returns:
+          list: list of transition dicts
+        """
+
+        return self.flight.do(('transitions', issue.key), self.jira.transitions, issue)
+
+    def get_project_versions(self, project):
+        """Function returns project versions sharing the request
+
+        Args:
+          project (str): Jira project key
+
+        Returns:
+          list: list of Jira project versions
+        """
+
+        return self.flight.do(('versions', project), self.jira.project_versions, project)
+
+    def forget_issue(self, key):
+        """Function removes memorized requests of the changed issue
+
+        Args:
+          key (str): An issue key
+        """
+
+        self.flight.forget(lambda request: request[0] != 'versions' and request[1] == key)
+
+    def get_request_stats(self):
+        """Function returns request coalescing counters
+
+        Returns:
+          dict: requests, coalesced and memo_hits
+        """
+
+        return dict(self.flight.stats)
 
     def get_expand_issue(self, issue):
         """Function returns expanded information for an issue
@@ -199,66 +912,619 @@ class JiraConnector(object):
           obj: Expanded information
         """
 
-        return self.jira.issue(issue.key, expand='changelog')
+        return self.get_issue(issue.key, expand='changelog')
+
+    def get_issues_by_keys(self, keys, fields=None, expand=None, chunk_size=None):
+        """Function returns issues for a list of keys using bulk search
+
+        Keys are deduplicated and split into "key in (...)" filters limited
+        by chunk size and max_jql_length, chunks are fetched concurrently
+        by workers threads.
+
+        Args:
+          keys (list): list of issue keys
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+          chunk_size (int, optional): maximal number of keys in a filter, count by default
+
+        Returns:
+          dict: key -> Jira issue object, None for missing keys
+        """
+
+        keys = sorted(set(key.strip().upper() for key in keys if key and key.strip()))
+        chunk_size = min(chunk_size or self.count, self.count)
+        chunks = []
+        chunk = []
+        length = len('key in ()')
+        for key in keys:
+            if chunk and (len(chunk) >= chunk_size or
+                          length + len(key) + 4 > self.max_jql_length):
+                chunks.append(chunk)
+                chunk = []
+                length = len('key in ()')
+            chunk.append(key)
+            length += len(key) + 4
+        if chunk:
+            chunks.append(chunk)
+
+        def search(chunk):
+            """Internal function fetching issues of one chunk"""
+            return self.search_page(
+                'key in (%s)' % ', '.join('"%s"' % key for key in chunk), 0,
+                fields, expand, max_results=len(chunk), validate_query=False)
+
+        found = dict((key, None) for key in keys)
+        if not chunks:
+            return found
+        pool = ThreadPool(min(self.workers, len(chunks)))
+        try:
+            for issues in pool.imap_unordered(search, chunks):
+                for issue in issues:
+                    if issue.key in found:
+                        found[issue.key] = issue
+        finally:
+            pool.terminate()
+        return found
 
     def get_last_resolver(self, issue, status='Developed'):
         """Function returns the recent resolver name
 
         Args:
-          issue (obj): The jira issue object
+          issue (obj): The jira issue object, its key or compact changelog
 
         Returns:
           str: The name of the recent resolver
         """
 
         resolver = ''
-        ex_issue = self.jira.issue(issue.key, expand='changelog')
-        changelog = ex_issue.changelog
+        for _, author, _, to_string in self.iter_status_items(self.get_changelog(issue)):
+            if to_string == status:
+                resolver = author
+        return resolver
+
+    def get_changelog(self, issue, fields=('status',)):
+        """Function returns complete changelog of the issue in compact form
+
+        Changelog expanded in the issue or search results is truncated for long
+        histories, then the rest is paged from the issue changelog resource.
+
+        Args:
+          issue (obj): Jira issue, its raw dict, key or compact changelog
+          fields (tuple, optional): changelog fields to keep, status by default
+
+        Returns:
+          dict: compact changelog with key, created and histories keys,
+            see jira_analytics.compact_issue
+        """
+
+        if isinstance(issue, dict) and 'histories' in issue:
+            return issue
+        if isinstance(issue, basestring):
+            raw = self.get_issue(issue, expand='changelog').raw
+        else:
+            raw = getattr(issue, 'raw', issue)
+            if 'changelog' not in raw:
+                raw = self.get_issue(raw['key'], expand='changelog').raw
+        histories = raw['changelog'].get('histories', [])
+        if len(histories) < raw['changelog'].get('total', len(histories)):
+            histories = self.get_changelog_histories(raw['key']) or histories
+        return compact_issue({'key': raw['key'], 'fields': raw.get('fields', {}),
+                              'changelog': {'histories': histories}}, fields)
+
+    def get_changelog_histories(self, key):
+        """Function returns all changelog histories of the issue page by page
+
+        Args:
+          key (str): An issue key
+
+        Returns:
+          list: list of raw histories, None if Jira has no changelog resource
+        """
+
+        histories = []
+        while True:
+            try:
+                data = self.request_json('issue/%s/changelog' % key,
+                                         {'startAt': len(histories), 'maxResults': 100})
+            except JIRAError as e:
+                if e.status_code == 404 and not histories:
+                    return None
+                raise
+            values = data.get('values', [])
+            histories.extend(values)
+            if not values or data.get('isLast', True) or \
+               len(histories) >= data.get('total', 0):
+                return histories
+
+    def get_changelogs(self, issues, fields=('status',)):
+        """Function returns complete changelogs of issues fetched by workers threads
+
+        Args:
+          issues (list): Jira issues, raw dicts or keys
+          fields (tuple, optional): changelog fields to keep, status by default
+
+        Returns:
+          dict: key -> compact changelog, see get_changelog
+        """
+
+        issues = list(issues)
+        if not issues:
+            return {}
+        pool = ThreadPool(min(self.workers, len(issues)))
+        try:
+            changelogs = pool.map(lambda issue: self.get_changelog(issue, fields), issues)
+        finally:
+            pool.terminate()
+        return dict((changelog['key'], changelog) for changelog in changelogs)
+
+    def request_json(self, path, params=None):
+        """Function returns JSON of Jira REST resource retrying transient errors
+
+        Args:
+          path (str): resource path like issue/KEY-1/changelog
+          params (dict, optional): query parameters
+
+        Returns:
+          dict: JSON response
+        """
+
+        attempt = 0
+        while True:
+            try:
+                return self.jira._get_json(path, params=params)
+            except (JIRAError, IOError) as e:
+                attempt += 1
+                if attempt > self.retries or not self.is_transient_error(e):
+                    raise
+                time.sleep(self.retry_delay * attempt)
+
+    def iter_status_items(self, changelog):
+        """Function yields status changes of changelog
+
+        Args:
+          changelog (obj): Jira issue changelog or compact changelog
+
+        Returns:
+          generator: (history created, author name, item, toString) tuples
+        """
+
+        if isinstance(changelog, dict):
+            for created, author, items in changelog['histories']:
+                for item in items:
+                    if item[0] == 'status':
+                        yield created, author, item, item[2]
+            return
         for history in changelog.histories:
             for item in history.items:
-                if item.field == 'status' and item.toString == status:
-                    # print ex_issue.raw
-                    # print 'Date:' + history.created + ' From:' +
-                    # item.fromString + ' To:' + item.toString + ' By:' +
-                    # history.author.name
-                    resolver = history.author.name
-        return resolver
+                if item.field == 'status':
+                    author = getattr(history, 'author', None)
+                    yield history.created, getattr(author, 'name', None), item, item.toString
 
-    def handle_all_issues(self, filter_str, method=None):
+    def handle_all_issues(self, filter_str, method=None, fields=None, expand=None,
+                          checkpoint=None, keyset=None):
         """Function handle list of issues from the filter
 
+        With checkpoint directory a rerun resumes the interrupted extraction,
+        the method is not called again for pages restored from the checkpoint.
+        Keyset pagination ignores the filter ordering and walks issues
+        by descending id or key, see iter_keyset_pages.
+
         Args:
           filter_string (str): Jira JQL filter
+          method (function, optional): callback called with every page of issues
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+          checkpoint (str, optional): path to checkpoint directory
+          keyset (bool, optional): use keyset pagination, pagination option by default
 
         Returns:
           list: list of Jira issues
         """
 
         all_issues = []
-        start = 0
-        while start < self.limit:
-            issues = self.jira.search_issues(
-                filter_str, startAt=start, maxResults=self.count)
-            start = start + self.count
-            if len(issues) == 0:
-                break
-            else:
+        if keyset is None:
+            keyset = self.pagination == 'keyset'
+        if checkpoint is not None:
+            checkpoint = Checkpoint(checkpoint, filter_str, fields, expand, self.count,
+                                    self.keyset_field if keyset else None)
+        if keyset:
+            pages = self.iter_keyset_pages(filter_str, fields, expand, checkpoint)
+        else:
+            pages = self.iter_pages(filter_str, fields, expand, checkpoint)
+        if method is not None and self.prefetch > 0:
+            pages = self.prefetch_pages(pages, self.prefetch)
+        try:
+            for page, issues, restored in pages:
                 all_issues.extend(issues)
-                if method is not None:
+                if method is not None and not restored:
                     method(issues)
+                if checkpoint is not None:
+                    checkpoint.complete(page)
+        finally:
+            # stop the prefetching thread at once if the callback fails
+            pages.close()
+        if checkpoint is not None:
+            checkpoint.finish()
         return all_issues
 
-    def list_all(self, filter_string):
+    def prefetch_pages(self, pages, depth=1):
+        """Function fetches pages in a background thread ahead of their processing
+
+        The thread blocks when depth pages are waiting in the queue,
+        errors of the fetching thread are raised in the caller.
+
+        Args:
+          pages (iterable): pages generator like iter_pages
+          depth (int): number of pages fetched in advance
+
+        Returns:
+          generator: items of pages
+        """
+
+        end = object()
+        queue = Queue.Queue(maxsize=depth)
+        stop = threading.Event()
+
+        def put(item):
+            """Internal function waiting for the free place in the queue"""
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Queue.Full:
+                    pass
+            return False
+
+        def produce():
+            """Internal function filling the queue"""
+            try:
+                for item in pages:
+                    if not put((item, None)):
+                        return
+            except Exception:  # pylint: disable=W0703
+                put((end, sys.exc_info()))
+                return
+            put((end, None))
+
+        thread = threading.Thread(target=produce)
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                item, error = queue.get()
+                if item is end:
+                    if error is not None:
+                        raise error[0], error[1], error[2]
+                    break
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def search_page(self, filter_str, start, fields=None, expand=None,
+                    max_results=None, validate_query=True):
+        """Function returns one page of issues retrying transient errors
+
+        Args:
+          filter_str (str): Jira JQL filter
+          start (int): index of the first issue
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+          max_results (int, optional): page size, count by default
+          validate_query (bool, optional): fail on unknown values in the filter
+
+        Returns:
+          list: list of Jira issues
+        """
+
+        attempt = 0
+        while True:
+            try:
+                return self.jira.search_issues(
+                    filter_str, startAt=start, maxResults=max_results or self.count,
+                    validate_query=validate_query, fields=fields, expand=expand)
+            except (JIRAError, IOError) as e:
+                attempt += 1
+                if attempt > self.retries or not self.is_transient_error(e):
+                    raise
+                time.sleep(self.retry_delay * attempt)
+
+    def iter_pages(self, filter_str, fields=None, expand=None, checkpoint=None, limit=None):
+        """Function yields pages of issues from the filter
+
+        With a checkpoint the stored pages are yielded first, then the failed
+        pages are retried and the extraction continues from the last position.
+        A failed page is skipped and retried after the others, the extraction
+        stops if several pages in a row fail.
+
+        Args:
+          filter_str (str): Jira JQL filter
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+          checkpoint (obj, optional): Checkpoint object
+          limit (int, optional): maximal number of issues, limit option by default
+
+        Returns:
+          generator: (page, list of Jira issues, restored) tuples
+        """
+
+        if limit is None:
+            limit = self.limit
+
+        if checkpoint is None:
+            page = 0
+            while page * self.count < limit:
+                issues = self.search_page(filter_str, page * self.count, fields, expand)
+                if len(issues) == 0:
+                    break
+                yield page, issues, False
+                page += 1
+            return
+
+        for page, raw_issues in checkpoint.pages():
+            yield page, [Issue(self.jira._options, self.jira._session, raw=raw)
+                         for raw in raw_issues], True
+        if checkpoint.state['done']:
+            return
+        failures = [0]
+
+        def fetch(page):
+            """Internal function fetching the page or marking it as failed"""
+            try:
+                issues = self.search_page(filter_str, page * self.count, fields, expand)
+            except (JIRAError, IOError):
+                checkpoint.fail(page)
+                failures[0] += 1
+                if failures[0] > self.retries:
+                    raise
+                return None
+            failures[0] = 0
+            if len(issues) > 0:
+                checkpoint.save_page(page, issues)
+            return issues
+
+        page = checkpoint.state['next']
+        # failed pages following the position are fetched again in order
+        deferred = [failed for failed in checkpoint.state['failed'] if failed < page]
+        while page * self.count < limit:
+            issues = fetch(page)
+            if issues is None:
+                deferred.append(page)
+            elif len(issues) == 0:
+                for failed in list(checkpoint.state['failed']):
+                    if failed >= page:
+                        checkpoint.discard(failed)
+                break
+            else:
+                yield page, issues, False
+            page += 1
+        for page in deferred:
+            issues = fetch(page)
+            if issues:
+                yield page, issues, False
+            elif issues is not None:
+                checkpoint.discard(page)
+
+    def get_keyset_filter(self, filter_str, cursor=None):
+        """Function returns the filter of the keyset page following the cursor
+
+        The filter ordering is replaced by descending keyset field.
+
+        Args:
+          filter_str (str): Jira JQL filter
+          cursor (str, optional): id or key of the last seen issue
+
+        Returns:
+          str: Jira JQL filter
+        """
+
+        tokens = list(JQL_TOKEN.finditer(filter_str))
+        for index, token in enumerate(tokens[:-1]):
+            if token.group().lower() == 'order' and tokens[index + 1].group().lower() == 'by':
+                filter_str = filter_str[:token.start()]
+                break
+        filter_str = filter_str.strip()
+        conditions = []
+        if filter_str:
+            conditions.append('(%s)' % filter_str)
+        if cursor is not None:
+            conditions.append('%s < "%s"' % (self.keyset_field, cursor))
+        return '%s order by %s desc' % (' and '.join(conditions), self.keyset_field)
+
+    def iter_keyset_pages(self, filter_str, fields=None, expand=None, checkpoint=None,
+                          limit=None):
+        """Function yields pages of issues from the filter using keyset pagination
+
+        Every page is requested from the start of the result set with
+        the condition on the last seen id or key, so the cost of a page does not
+        grow with the depth and issues created during the scan do not shift pages.
+        Checkpointed extraction resumes from the last cursor, failed pages
+        can not be skipped in this mode.
+
+        Args:
+          filter_str (str): Jira JQL filter
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+          checkpoint (obj, optional): Checkpoint object
+          limit (int, optional): maximal number of issues, limit option by default
+
+        Returns:
+          generator: (page, list of Jira issues, restored) tuples
+        """
+
+        if limit is None:
+            limit = self.limit
+
+        page = 0
+        cursor = None
+        if checkpoint is not None:
+            for page, raw_issues in checkpoint.pages():
+                yield page, [Issue(self.jira._options, self.jira._session, raw=raw)
+                             for raw in raw_issues], True
+            if checkpoint.state['done']:
+                return
+            page = checkpoint.state['next']
+            cursor = checkpoint.state['cursor']
+        while page * self.count < limit:
+            issues = self.search_page(
+                self.get_keyset_filter(filter_str, cursor), 0, fields, expand)
+            if len(issues) == 0:
+                break
+            cursor = getattr(issues[-1], self.keyset_field)
+            if checkpoint is not None:
+                checkpoint.save_page(page, issues, cursor)
+            yield page, issues, False
+            if len(issues) < self.count:
+                break
+            page += 1
+
+    def iter_issues(self, filter_str, fields=None, expand=None, keyset=None, limit=None):
+        """Function yields issues from the filter without keeping them in memory
+
+        Args:
+          filter_str (str): Jira JQL filter
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+          keyset (bool, optional): use keyset pagination, pagination option by default
+          limit (int, optional): maximal number of issues, limit option by default
+
+        Returns:
+          generator: Jira issues
+        """
+
+        if keyset is None:
+            keyset = self.pagination == 'keyset'
+        if keyset:
+            pages = self.iter_keyset_pages(filter_str, fields, expand, limit=limit)
+        else:
+            pages = self.iter_pages(filter_str, fields, expand, limit=limit)
+        if self.prefetch > 0:
+            pages = self.prefetch_pages(pages, self.prefetch)
+        for _, issues, _ in pages:
+            for issue in issues:
+                yield issue
+
+    def list_all(self, filter_string, fields=None, expand=None):
         """Function returns list of issues from the filter
 
+        Results are cached in memory if cache_size is set
+
         Args:
           filter_string (str): Jira JQL filter
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
 
         Returns:
            list: list of Jira issues
         """
 
-        return self.handle_all_issues(filter_string)
+        if not self.cache_size:
+            return self.handle_all_issues(filter_string, fields=fields, expand=expand)
+        key = self.get_cache_key(filter_string, fields, expand)
+        issues = self.cache.get(key)
+        if issues is None:
+            issues = self.handle_all_issues(filter_string, fields=fields, expand=expand)
+            self.cache.put(key, issues)
+        return list(issues)
+
+    def get_cache_key(self, filter_string, fields=None, expand=None):
+        """Function returns cache key of the query
+
+        Args:
+          filter_string (str): Jira JQL filter
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+
+        Returns:
+          tuple: normalized filter, fields, expand and limit
+        """
+
+        def normalize_list(value):
+            """Internal function sorting comma separated values"""
+            if value is None:
+                return None
+            if isinstance(value, basestring):
+                value = value.split(',')
+            return ','.join(sorted(item.strip() for item in value))
+
+        return (normalize_jql(filter_string), normalize_list(fields),
+                normalize_list(expand), self.limit)
+
+    def invalidate_cache(self, filter_string=None):
+        """Function removes cached results of the filter, all results by default
+
+        Args:
+          filter_string (str, optional): Jira JQL filter
+
+        Returns:
+          int: number of removed results
+        """
+
+        if filter_string is None:
+            return self.cache.invalidate()
+        jql = normalize_jql(filter_string)
+        return self.cache.invalidate(lambda key: key[0] == jql)
+
+    def apply_issue_event(self, event):
+        """Function applies Jira webhook issue event to cached results
+
+        Updated issues are replaced in place, deleted ones are removed.
+        Results are dropped if they may gain or lose issues: created issues
+        of the queried project, changes of fields used in the filter, and
+        results expanded by changelog, which webhook payload does not contain.
+
+        Args:
+          event (dict): webhook payload with webhookEvent, issue and changelog keys
+
+        Returns:
+          int: number of changed or dropped results
+        """
+
+        raw = event.get('issue') or {}
+        key = raw.get('key')
+        if key is None:
+            return 0
+        name = event.get('webhookEvent', '')
+        project = ((raw.get('fields') or {}).get('project') or {}).get('key', '')
+        changed_fields = set(normalize_field(item.get('field', ''))
+                             for item in (event.get('changelog') or {}).get('items', []))
+
+        def apply(cache_key, issues):
+            """Internal function updating one cached result"""
+            jql, _, expand = cache_key[0], cache_key[1], cache_key[2]
+            found = [index for index, issue in enumerate(issues) if issue.key == key]
+            if name == 'jira:issue_created':
+                if 'project' not in get_jql_fields(jql) or \
+                   re.search(r'\b%s\b' % re.escape(project), jql, re.I):
+                    return None
+                return issues
+            if name == 'jira:issue_deleted':
+                if not found:
+                    return issues
+                return [issue for issue in issues if issue.key != key]
+            if changed_fields & get_jql_fields(jql):
+                return None
+            if not found:
+                return issues
+            if expand:
+                return None
+            issues = list(issues)
+            for index in found:
+                issues[index] = Issue(self.jira._options, self.jira._session, raw=raw)
+            return issues
+
+        return self.cache.update(apply)
+
+    def get_cache_stats(self):
+        """Function returns cache counters
+
+        Returns:
+          dict: hits, misses, evictions and current size
+        """
+
+        stats = dict(self.cache.stats)
+        stats['size'] = len(self.cache.items)
+        return stats
 
     def print_all(self, filter_string):
         """Function prints list of issues from the filter
@@ -304,7 +1570,7 @@ class JiraConnector(object):
         """
 
         index = 0
-        transition_list = self.jira.transitions(issue)
+        transition_list = self.get_transitions(issue)
         if any(n['name'] == status for n in transition_list):
             index = filter(lambda n: n.get('name') ==
                            status, transition_list)[0]['id']
@@ -326,7 +1592,8 @@ class JiraConnector(object):
             # print '\tAvailable transitions: ' + str([(t['id'], t['name']) for
             # t in jira.transitions(issue)]).strip('[]')
             self.jira.transition_issue(issue, transition_id)
-            issue = self.jira.issue(issue.key)
+            self.forget_issue(issue.key)
+            issue = self.get_issue(issue.key)
         return {'type': issue.fields.issuetype.name,
                 'key': issue.key,
                 'status': issue.fields.status.name,
@@ -336,24 +1603,23 @@ class JiraConnector(object):
         """Function returns list of all transitions to Reopen status
 
         Args:
-          changelog (obj): Jira issue changelog
+          changelog (obj): Jira issue changelog or compact changelog
 
         Returns:
           list: list of transitions
         """
 
         all_items = []
-        for history in changelog.histories:
-            for item in history.items:
-                if item.field == 'status' and item.toString == 'Reopened':
-                    all_items.append(item)
+        for _, _, item, to_string in self.iter_status_items(changelog):
+            if to_string == 'Reopened':
+                all_items.append(item)
         return all_items
 
     def get_reopen_count(self, changelog):
         """Function returns count of all transitions to Reopen status
 
         Args:
-          changelog (obj): Jira issue changelog
+          changelog (obj): Jira issue changelog or compact changelog
 
         Returns:
           int: Count of transitions
@@ -365,7 +1631,7 @@ class JiraConnector(object):
         """Function returns the date of the last resolution
 
         Args:
-          changelog (obj): Jira issue changelog
+          changelog (obj): Jira issue changelog or compact changelog
           status (string): status specifier for filtering
 
         Returns:
@@ -374,14 +1640,61 @@ class JiraConnector(object):
 
         date = None
         all_items = []
-        for history in changelog.histories:
-            for item in history.items:
-                if item.field == 'status' and item.toString == status:
-                    all_items.append(history.created)
+        for created, _, _, to_string in self.iter_status_items(changelog):
+            if to_string == status:
+                all_items.append(created)
         if len(all_items) > 0:
             date = all_items[-1]
         return date
 
+    def get_time_in_status(self, filter_string, group_by=None, keep_issues=True):
+        """Function returns time spent by issues from the filter in every status
+
+        Issues are fetched with changelog page by page and are not kept in memory,
+        truncated changelogs of long-lived issues are completed by get_changelog.
+
+        Args:
+          filter_string (str): Jira JQL filter
+          group_by (list, optional): fields to aggregate by like fixVersions, assignee, issuetype
+          keep_issues (bool, optional): keep per-issue matrix, True by default
+
+        Returns:
+          obj: TimeInStatus object
+        """
+
+        time_in_status = TimeInStatus(group_by, keep_issues)
+        fields = ','.join(['created', 'status'] + time_in_status.group_by)
+        for issue in self.iter_issues(filter_string, fields=fields, expand='changelog'):
+            time_in_status.add(issue, self.get_changelog(issue))
+        return time_in_status
+
+    def get_lead_time_sketches(self, filter_string, group_by='fixVersions', sketches=None):
+        """Function returns sketches of lead times from creation to resolution
+
+        Issues are streamed page by page, memory does not depend on their number.
+        Unresolved issues are skipped.
+
+        Args:
+          filter_string (str): Jira JQL filter
+          group_by (str, optional): field to group by, fixVersions by default
+          sketches (obj, optional): SketchSet object to add values to, e.g. from a previous run
+
+        Returns:
+          obj: SketchSet object with lead times in seconds
+        """
+
+        if sketches is None:
+            sketches = SketchSet()
+        fields = 'created,resolutiondate,%s' % group_by
+        for issue in self.iter_issues(filter_string, fields=fields):
+            if not issue.raw['fields'].get('resolutiondate'):
+                continue
+            lead_time = self.parse_date(issue.raw['fields']['resolutiondate']) - \
+                self.parse_date(issue.raw['fields']['created'])
+            for group in field_values(issue.raw, group_by):
+                sketches.add(group, lead_time.total_seconds())
+        return sketches
+
     def parse_date(self, date_string):
         """Function returns date object
 
@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""FederatedJiraConnector class querying several Jira servers and projects at once.
+
+Every server gets its own [JiraConnector](jira_connector.md), the requests are
+run concurrently with a global and a per server limit of parallel workers, and
+the results are merged into one stream of issues tagged by their source.
+
+## Config
+
+```yaml
+workers: 8
+projects: ['TRANS']
+servers:
+  - name: public
+    url: 'https://jira.atlassian.com'
+    limit: 100
+    count: 50
+    workers: 2
+  - name: internal
+    url: 'https://jira.example.com'
+    username: user
+    password: secret
+    projects: ['FE', 'BE']
+```
+
+## Usage
+
+```python
+from jira_federation import FederatedJiraConnector
+
+federation = FederatedJiraConnector(config='config/federation.yml')
+for issue in federation.iter_all('project="{project}" order by key desc'):
+    print "%s: %s - %s" % (issue.source, issue.key, issue.fields.summary)
+
+bugs = federation.get_bug_list('1.4.2')
+```
+
+"""
+
+import threading
+from multiprocessing.pool import ThreadPool
+from jira_connector import JiraConnector
+
+__author__ = "Alexander Grechin"
+__version__ = "0.4"
+__maintainer__ = "Alexander Grechin"
+__license__ = "GNU GPL V2"
+
+PROJECT_HELPERS = ('get_bug_list', 'get_bug_crit_list', 'get_reopen_bug_list',
+                   'get_bug_prod_list', 'get_bugfix_list', 'get_task_list',
+                   'get_deploy_task_list')
+
+
+class FederatedJiraConnector(object):
+    """FederatedJiraConnector class
+        Attributes:
+            servers (list): list of dicts with JiraConnector arguments,
+                extended by name, projects and workers keys
+            projects (list, optional): default list of projects for servers without own list
+            workers (int, optional): Global number of parallel requests, 4 by default
+            server_workers (int, optional): Default number of parallel requests per server, 2 by default
+            config (str): path to config file in YAML format, which add and replace direct values
+    """
+
+    def __init__(self, **kwargs):
+        """Initialization"""
+        if 'config' in kwargs and kwargs['config'] is not None:
+            try:
+                with open(kwargs['config'], "r") as config_file:
+                    try:
+                        import yaml
+                        config = yaml.load(config_file)
+                        self.__dict__.update(config)
+                        for key in config:
+                            if key in kwargs and kwargs[key] is None:
+                                kwargs[key] = config[key]
+                    except yaml.YAMLError as e:
+                        print(e.problem)
+            except ImportError as e:
+                print e.message
+        #repeate to overwrite config
+        self.__dict__.update(kwargs)
+        if 'servers' not in self.__dict__ or self.servers is None:
+            self.servers = []
+        if 'projects' not in self.__dict__ or self.projects is None:
+            self.projects = []
+        if 'workers' not in self.__dict__ or self.workers is None:
+            self.workers = 4
+        if 'server_workers' not in self.__dict__ or self.server_workers is None:
+            self.server_workers = 2
+        self.workers = int(self.workers)
+
+        self.connectors = []
+        for server in self.servers:
+            server = dict(server)
+            name = server.pop('name', None) or server.get('url')
+            projects = server.pop('projects', None) or self.projects
+            workers = int(server.pop('workers', None) or self.server_workers)
+            self.connectors.append({
+                'name': name,
+                'projects': list(projects),
+                'semaphore': threading.BoundedSemaphore(workers),
+                'connector': JiraConnector(**server)})
+
+    def get_connector(self, name):
+        """Function returns connector of the server by name
+
+        Args:
+          name (str): server name from config
+
+        Returns:
+          obj: JiraConnector object or None
+        """
+
+        for server in self.connectors:
+            if server['name'] == name:
+                return server['connector']
+        return None
+
+    def _call(self, task):
+        """Internal function running one method on one server and project"""
+
+        server, project, method_name, args, kwargs = task
+        with server['semaphore']:
+            issues = getattr(server['connector'], method_name)(*args, **kwargs)
+        for issue in issues:
+            issue.source = server['name']
+            issue.source_project = project
+        return issues
+
+    def imap(self, method_name, *args, **kwargs):
+        """Function runs JiraConnector method on all servers and projects concurrently
+
+        The project is passed as the first argument of the method,
+        issues are yielded as soon as any server returns its part.
+
+        Args:
+          method_name (str): name of JiraConnector method like get_bug_list
+          args (list): method arguments following the project
+
+        Returns:
+          generator: Jira issues tagged by source and source_project attributes
+        """
+
+        tasks = []
+        for server in self.connectors:
+            for project in server['projects']:
+                tasks.append((server, project, method_name,
+                              (project,) + args, kwargs))
+        return self._imap(tasks)
+
+    def _imap(self, tasks):
+        """Internal generator merging results of tasks in completion order"""
+
+        if not tasks:
+            return
+        pool = ThreadPool(min(self.workers, len(tasks)))
+        try:
+            for issues in pool.imap_unordered(self._call, tasks):
+                for issue in issues:
+                    yield issue
+        finally:
+            pool.terminate()
+
+    def iter_all(self, filter_string):
+        """Function yields issues from the filter on all servers
+
+        The filter is formatted by every server project if it contains
+        {project} placeholder, otherwise it runs once per server.
+
+        Args:
+          filter_string (str): Jira JQL filter
+
+        Returns:
+          generator: Jira issues tagged by source and source_project attributes
+        """
+
+        tasks = []
+        for server in self.connectors:
+            if '{project}' in filter_string:
+                for project in server['projects']:
+                    tasks.append((server, project, 'list_all',
+                                  (filter_string.format(project=project),), {}))
+            else:
+                tasks.append((server, None, 'list_all', (filter_string,), {}))
+        return self._imap(tasks)
+
+    def list_all(self, filter_string):
+        """Function returns list of issues from the filter on all servers
+
+        Args:
+          filter_string (str): Jira JQL filter
+
+        Returns:
+           list: list of Jira issues tagged by source
+        """
+
+        return list(self.iter_all(filter_string))
+
+    def __getattr__(self, name):
+        """Proxy project helpers of JiraConnector to all servers and projects"""
+
+        if name in PROJECT_HELPERS:
+            def method(*args, **kwargs):
+                """Internal federated helper"""
+                return list(self.imap(name, *args, **kwargs))
+            return method
+        raise AttributeError(name)
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Sharded extraction of large Jira filters.
+
+The filter is split into disjoint windows of `created` dates or issue ids,
+sized by the number of found issues. Shards are extracted by worker
+processes on the local host, or by workers on several hosts sharing
+a work-queue directory, and the results are merged deduplicated by key.
+
+## Usage
+
+```python
+from jira_sharding import ShardedExtraction
+
+extraction = ShardedExtraction(config='config/config.yml', shard_size=2000)
+issues = extraction.run('project="FE"', processes=8)
+print len(issues)
+```
+
+Several hosts sharing a directory:
+
+    $ python jira_sharding.py plan /mnt/queue config/config.yml 'project="FE"'
+    $ python jira_sharding.py work /mnt/queue config/config.yml    # on every host
+    $ python jira_sharding.py merge /mnt/queue issues.json
+
+"""
+
+import os
+import sys
+import json
+import socket
+import datetime
+from multiprocessing import Pool
+import dateutil.parser
+from jira_connector import JiraConnector
+
+__author__ = "Alexander Grechin"
+__version__ = "0.4"
+__maintainer__ = "Alexander Grechin"
+__license__ = "GNU GPL V2"
+
+DATE_FORMAT = '%Y/%m/%d %H:%M'
+
+
+def _extract_shard(task):
+    """Internal worker function returning raw issues of the shard as JSON"""
+
+    connector_kwargs, shard, fields, expand = task
+    connector = JiraConnector(**connector_kwargs)
+    # the shard may grow between planning and extraction
+    issues = connector.iter_issues(shard['filter'], fields=fields, expand=expand,
+                                   limit=sys.maxsize)
+    return json.dumps([issue.raw for issue in issues])
+
+
+class ShardedExtraction(object):
+    """ShardedExtraction class
+        Attributes:
+            connector_kwargs (dict): JiraConnector arguments used by every worker
+            shard_size (int, optional): Maximal number of issues in a shard, 1000 by default
+            by (str, optional): created or id windows, created by default
+    """
+
+    def __init__(self, shard_size=1000, by='created', **connector_kwargs):
+        """Initialization"""
+        self.shard_size = int(shard_size)
+        self.by = by
+        self.connector_kwargs = connector_kwargs
+        self.connector = None
+
+    def get_connector(self):
+        """Function returns connector used for planning"""
+
+        if self.connector is None:
+            self.connector = JiraConnector(**self.connector_kwargs)
+        return self.connector
+
+    def count(self, filter_str, order=None):
+        """Function returns number of issues and the first issue in the order
+
+        Args:
+          filter_str (str): Jira JQL filter
+          order (str, optional): order by clause
+
+        Returns:
+          tuple: total and the first issue or None
+        """
+
+        if order:
+            filter_str = '%s order by %s' % (filter_str, order)
+        issues = self.get_connector().search_page(filter_str, 0, fields='created',
+                                                  max_results=1)
+        return issues.total, issues[0] if len(issues) else None
+
+    def get_value(self, issue):
+        """Function returns numeric window value of the issue, id or minute of creation"""
+
+        if self.by == 'id':
+            return int(issue.id)
+        created = dateutil.parser.parse(issue.fields.created)
+        return int((created.replace(tzinfo=None) - created.utcoffset() -
+                    datetime.datetime(1970, 1, 1)).total_seconds() // 60)
+
+    def get_condition(self, low, high):
+        """Function returns JQL condition of the window [low, high), None means unbounded"""
+
+        conditions = []
+        for operator, value in (('>=', low), ('<', high)):
+            if value is None:
+                continue
+            if self.by == 'created':
+                value = '"%s"' % (datetime.datetime(1970, 1, 1) +
+                                  datetime.timedelta(minutes=value)).strftime(DATE_FORMAT)
+            conditions.append('%s %s %s' % (self.by, operator, value))
+        return ' and '.join(conditions)
+
+    def plan(self, filter_str):
+        """Function splits the filter into disjoint shards
+
+        Windows are bisected until the number of issues in each fits
+        shard_size, empty windows are merged into neighbouring shards, so
+        the shards cover the whole range. The first and the last windows are
+        unbounded to cover issues created during the planning.
+
+        Args:
+          filter_str (str): Jira JQL filter without ordering
+
+        Returns:
+          list: list of shards, dicts with filter and count keys
+        """
+
+        base = '(%s)' % filter_str
+        total, first = self.count(base, '%s asc' % self.by)
+        if first is None:
+            return []
+        _, last = self.count(base, '%s desc' % self.by)
+        low, high = self.get_value(first), self.get_value(last) + 1
+
+        shards = []
+        windows = [(low, high, total)]
+        while windows:
+            low, high, count = windows.pop(0)
+            if count > self.shard_size and high - low > 1:
+                middle = (low + high) // 2
+                for window in ((low, middle), (middle, high)):
+                    window_count, _ = self.count('%s and %s' % (base, self.get_condition(*window)))
+                    windows.append(window + (window_count,))
+            else:
+                shards.append((low, high, count))
+
+        merged = []
+        for low, high, count in sorted(shards):
+            if merged and (count == 0 or merged[-1][2] == 0):
+                merged[-1] = (merged[-1][0], high, merged[-1][2] + count)
+            else:
+                merged.append((low, high, count))
+
+        result = []
+        for index, (low, high, count) in enumerate(merged):
+            if index == 0:
+                low = None
+            if index == len(merged) - 1:
+                high = None
+            condition = self.get_condition(low, high)
+            result.append({'id': index, 'count': count,
+                           'filter': '%s and %s' % (base, condition) if condition else base})
+        return result
+
+    def run(self, filter_str, processes=None, fields=None, expand=None):
+        """Function extracts issues of the filter by worker processes
+
+        Args:
+          filter_str (str): Jira JQL filter without ordering
+          processes (int, optional): Number of worker processes, CPU count by default
+          fields (str, optional): comma separated list of fields to return
+          expand (str, optional): comma separated list of entities to expand
+
+        Returns:
+          dict: key -> raw Jira issue
+        """
+
+        tasks = [(self.connector_kwargs, shard, fields, expand)
+                 for shard in self.plan(filter_str)]
+        issues = {}
+        if not tasks:
+            return issues
+        pool = Pool(processes)
+        try:
+            for result in pool.imap_unordered(_extract_shard, tasks):
+                merge(issues, json.loads(result))
+        finally:
+            pool.close()
+            pool.join()
+        return issues
+
+
+def merge(issues, raw_issues):
+    """Function merges raw issues into the dict deduplicating them by key
+
+    Args:
+      issues (dict): key -> raw Jira issue
+      raw_issues (list): list of raw Jira issues
+    """
+
+    for raw in raw_issues:
+        issues[raw['key']] = raw
+
+
+class WorkQueue(object):
+    """WorkQueue class, shards shared by workers on several hosts through a directory
+        Attributes:
+            path (str): queue directory with pending, running and done subdirectories
+    """
+
+    def __init__(self, path):
+        """Initialization"""
+        self.path = path
+        for name in ('pending', 'running', 'done'):
+            if not os.path.exists(os.path.join(path, name)):
+                os.makedirs(os.path.join(path, name))
+
+    def put(self, shards, fields=None, expand=None):
+        """Function adds shards to the queue"""
+
+        for shard in shards:
+            shard = dict(shard, fields=fields, expand=expand)
+            name = os.path.join(self.path, 'pending', 'shard_%06d.json' % shard['id'])
+            with open(name + '.tmp', 'w') as shard_file:
+                json.dump(shard, shard_file)
+            os.rename(name + '.tmp', name)
+
+    def claim(self):
+        """Function moves a pending shard to running ones
+
+        Rename is atomic, so every shard is claimed by one worker only.
+
+        Returns:
+          dict: shard or None if the queue is empty
+        """
+
+        worker = '%s.%d' % (socket.gethostname(), os.getpid())
+        for name in sorted(os.listdir(os.path.join(self.path, 'pending'))):
+            if not name.endswith('.json'):
+                continue
+            running = os.path.join(self.path, 'running', '%s.%s' % (name, worker))
+            try:
+                os.rename(os.path.join(self.path, 'pending', name), running)
+            except OSError:
+                continue
+            with open(running, 'r') as shard_file:
+                shard = json.load(shard_file)
+            shard['running'] = running
+            return shard
+        return None
+
+    def done(self, shard, raw_issues):
+        """Function stores issues of the shard and removes it from running ones"""
+
+        name = os.path.join(self.path, 'done', 'shard_%06d.json' % shard['id'])
+        with open(name + '.tmp', 'w') as done_file:
+            json.dump(raw_issues, done_file)
+        os.rename(name + '.tmp', name)
+        os.remove(shard['running'])
+
+    def release(self, shard):
+        """Function returns the failed shard to pending ones"""
+
+        os.rename(shard['running'], os.path.join(
+            self.path, 'pending', 'shard_%06d.json' % shard['id']))
+
+    def work(self, connector_kwargs):
+        """Function extracts shards until the queue is empty
+
+        Args:
+          connector_kwargs (dict): JiraConnector arguments
+
+        Returns:
+          int: number of extracted shards
+        """
+
+        count = 0
+        while True:
+            shard = self.claim()
+            if shard is None:
+                return count
+            try:
+                raw_issues = json.loads(_extract_shard(
+                    (connector_kwargs, shard, shard.get('fields'), shard.get('expand'))))
+            except BaseException:
+                self.release(shard)
+                raise
+            self.done(shard, raw_issues)
+            count += 1
+
+    def results(self):
+        """Function returns merged issues of done shards
+
+        Returns:
+          dict: key -> raw Jira issue
+        """
+
+        issues = {}
+        for name in sorted(os.listdir(os.path.join(self.path, 'done'))):
+            if name.endswith('.json'):
+                with open(os.path.join(self.path, 'done', name), 'r') as done_file:
+                    merge(issues, json.load(done_file))
+        return issues
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 4 and sys.argv[1] in ('plan', 'work', 'merge'):
+        queue = WorkQueue(sys.argv[2])
+        if sys.argv[1] == 'plan' and len(sys.argv) == 5:
+            shards = ShardedExtraction(config=sys.argv[3]).plan(sys.argv[4])
+            queue.put(shards)
+            sys.stdout.write("Planned %d shards in %s\n" % (len(shards), sys.argv[2]))
+            sys.exit(0)
+        elif sys.argv[1] == 'work':
+            count = queue.work({'config': sys.argv[3]})
+            sys.stdout.write("Extracted %d shards\n" % count)
+            sys.exit(0)
+        elif sys.argv[1] == 'merge':
+            with open(sys.argv[3], 'w') as result_file:
+                json.dump(queue.results().values(), result_file)
+            sys.exit(0)
+    sys.stderr.write('Usage: %s plan <queue_dir> <config.yml> <jql>\n'
+                     '       %s work <queue_dir> <config.yml>\n'
+                     '       %s merge <queue_dir> <result.json>\n'
+                     % (sys.argv[0], sys.argv[0], sys.argv[0]))
+    sys.exit(1)
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""JiraWebhookReceiver class, embedded HTTP server for Jira webhooks.
+
+Jira issue created, updated and deleted events are applied to the result cache
+of [JiraConnector](jira_connector.md), so `list_all` and the `get_*_list`
+helpers answer from fresh local data without polling. Register the webhook in
+Jira with the receiver URL, e.g. `http://host:8090/?secret=...`.
+
+## Usage
+
+```python
+from jira_connector import JiraConnector
+from jira_webhook import JiraWebhookReceiver
+
+jira_connect = JiraConnector(config='config/config.yml', cache_size=100, cache_ttl=None)
+receiver = JiraWebhookReceiver(jira_connect, host='0.0.0.0', port=8090, secret='secret')
+receiver.start()
+bugs = jira_connect.get_bug_list('FE', '1.4.2')
+```
+
+Recorded payloads can be replayed to the local server:
+
+    $ curl -X POST -d @issue_updated.json 'http://localhost:8090/?secret=secret'
+
+"""
+
+import json
+import urlparse
+import threading
+import SocketServer
+import BaseHTTPServer
+
+__author__ = "Alexander Grechin"
+__version__ = "0.4"
+__maintainer__ = "Alexander Grechin"
+__license__ = "GNU GPL V2"
+
+
+class WebhookHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """WebhookHandler class, applies posted Jira events to the connector cache"""
+
+    def do_POST(self):  # pylint: disable=C0103
+        """Handle webhook request"""
+        receiver = self.server.receiver
+        url = urlparse.urlparse(self.path)
+        query = urlparse.parse_qs(url.query)
+        if url.path != receiver.path:
+            self.respond(404, {'error': 'unknown path'})
+            return
+        if receiver.secret is not None and query.get('secret') != [receiver.secret]:
+            self.respond(403, {'error': 'wrong secret'})
+            return
+        try:
+            length = int(self.headers.getheader('content-length') or 0)
+            event = json.loads(self.rfile.read(length))
+        except ValueError:
+            self.respond(400, {'error': 'wrong payload'})
+            return
+        if not isinstance(event, dict):
+            self.respond(400, {'error': 'wrong payload'})
+            return
+        try:
+            changed = receiver.apply(event)
+        except Exception as e:  # pylint: disable=W0703
+            self.respond(500, {'error': str(e)})
+            return
+        self.respond(200, {'changed': changed})
+
+    def respond(self, code, body):
+        """Send JSON response"""
+        body = json.dumps(body)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Keep the output of the connector clean"""
+        pass
+
+
+class WebhookServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """WebhookServer class, threaded HTTP server"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class JiraWebhookReceiver(object):
+    """JiraWebhookReceiver class
+        Attributes:
+            connector (obj): JiraConnector object with enabled cache
+            host (str, optional): listening address, 127.0.0.1 by default
+            port (int, optional): listening port, 8090 by default, 0 selects a free one
+            path (str, optional): webhook URL path, / by default
+            secret (str, optional): value of secret query parameter expected in requests
+            stats (dict): number of received, applied and ignored events
+    """
+
+    def __init__(self, connector, host='127.0.0.1', port=8090, path='/', secret=None):
+        """Initialization"""
+        self.connector = connector
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret = secret
+        self.server = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stats = {'received': 0, 'applied': 0, 'ignored': 0}
+
+    def apply(self, event):
+        """Function applies Jira issue event to the connector cache
+
+        Args:
+          event (dict): webhook payload
+
+        Returns:
+          int: number of changed or dropped cached results
+        """
+
+        with self.lock:
+            self.stats['received'] += 1
+            if not str(event.get('webhookEvent', '')).startswith('jira:issue_'):
+                self.stats['ignored'] += 1
+                return 0
+            self.stats['applied'] += 1
+        return self.connector.apply_issue_event(event)
+
+    def start(self):
+        """Function starts the server in a background thread
+
+        Returns:
+          int: listening port
+        """
+
+        self.server = WebhookServer((self.host, self.port), WebhookHandler)
+        self.server.receiver = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        """Function stops the server"""
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None